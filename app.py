@@ -1,77 +1,53 @@
-import re
+import hashlib
+import logging
+import tempfile
+from dataclasses import asdict
 from io import BytesIO
 
 import pandas as pd
 import streamlit as st
 
-PLACEHOLDER_RE = re.compile(r"\{\{\s*([^\}]+?)\s*\}\}")
-
-
-def norm_key(s: str) -> str:
-    # case-insensitive, ignore spaces + underscores
-    return re.sub(r"[ _]+", "", str(s).strip().lower())
-
-
-def extract_placeholders(template: str) -> list[str]:
-    return PLACEHOLDER_RE.findall(template)
-
-
-def build_header_map(df: pd.DataFrame) -> dict[str, str]:
-    # {normalized_header: original_header} (first wins)
-    m: dict[str, str] = {}
-    for col in df.columns:
-        k = norm_key(col)
-        if k not in m:
-            m[k] = col
-    return m
-
-
-def validate_mappings(all_templates: list[str], header_map: dict[str, str]):
-    # Validate placeholders across ALL templates passed in
-    all_placeholders: list[str] = []
-    for t in all_templates:
-        all_placeholders.extend(extract_placeholders(t))
-
-    missing: list[str] = []
-    mapping: dict[str, str] = {}
-    for ph in all_placeholders:
-        key = norm_key(ph)
-        if key in header_map:
-            mapping[ph] = header_map[key]
-        else:
-            missing.append(ph)
-
-    # de-dupe missing while preserving order
-    seen = set()
-    missing_unique: list[str] = []
-    for m in missing:
-        if m not in seen:
-            missing_unique.append(m)
-            seen.add(m)
-
-    return mapping, missing_unique
-
-
-def merge_row(template: str, row: pd.Series, mapping: dict[str, str], blank_fill: str) -> str:
-    def repl(match: re.Match) -> str:
-        raw = match.group(1)
-        col = mapping.get(raw)
-        if not col:
-            return ""
-        val = row.get(col, "")
-        if pd.isna(val) or str(val).strip() == "":
-            return blank_fill
-        return str(val)
-
-    return PLACEHOLDER_RE.sub(repl, template)
-
-
-def find_email_column(df: pd.DataFrame) -> str | None:
-    # match any "Email" variant (case/spaces/underscores)
-    for col in df.columns:
-        if norm_key(col) == "email":
-            return col
-    return None
+from outreach import (
+    EXCEL_ENGINES,
+    OUTPUT_FORMATS,
+    PARALLEL_MIN_ROWS,
+    PROGRESS_CHUNK_ROWS,
+    RENDERED_ROLES,
+    AdmissionScheduler,
+    CompiledTemplate,
+    GenerationJob,
+    JobCancelled,
+    LeadFilter,
+    LeadStream,
+    MergePlan,
+    ResultCache,
+    StageTimer,
+    UnmappedPlaceholders,
+    append_chunks,
+    build_header_map,
+    column_bytes,
+    default_workers,
+    email_column_text,
+    estimate_job_bytes,
+    excel_engine,
+    excel_sheet_names,
+    find_email_column,
+    frame_chunks,
+    input_format,
+    is_gzip,
+    merge_incremental,
+    merge_parallel,
+    open_stream,
+    plan_merge,
+    read_columns,
+    read_head,
+    read_header,
+    read_tracker,
+    render_frame,
+    track_rows,
+    validate_mappings,
+    write_outreach,
+)
 
 
 def template_editor(title: str, session_key: str, min_templates: int = 1, help_text: str | None = None):
@@ -108,6 +84,407 @@ def template_editor(title: str, session_key: str, min_templates: int = 1, help_t
 
 # ---------------- UI ----------------
 
+def upload_digest(uploaded) -> str:
+    # Content hash of the current upload, computed once per file rather than on every rerun
+    digests = st.session_state.setdefault("upload_digests", {})
+    if uploaded.file_id not in digests:
+        digests.clear()
+        digests[uploaded.file_id] = hashlib.sha256(uploaded.getvalue()).hexdigest()
+    return digests[uploaded.file_id]
+
+
+# Parsed uploads are cached by content hash (+ format, sheet, parsed columns), so template edits
+# and repeat clicks on the same list skip the parse. `_data` is excluded from the cache key.
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_sheet_names(digest: str, _data: bytes) -> list[str]:
+    return excel_sheet_names(BytesIO(_data))
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_header(digest: str, fmt: str, sheet: str | int, engine: str, _data: bytes) -> tuple[list, dict[str, str]]:
+    columns = read_header(BytesIO(_data), fmt, sheet, engine)
+    return columns, build_header_map(pd.DataFrame(columns=columns))
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def cached_columns(digest: str, fmt: str, sheet: str | int, engine: str, columns: tuple, _data: bytes) -> pd.DataFrame:
+    return read_columns(BytesIO(_data), list(columns), fmt, sheet, engine)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_preview_rows(
+    digest: str, fmt: str, sheet: str | int, engine: str, n: int, sample: bool, _data: bytes
+) -> pd.DataFrame:
+    # First n rows (+ a fixed random sample of n more), every column, original row labels kept
+    columns = cached_header(digest, fmt, sheet, engine, _data)[0]
+    if not sample:
+        return read_head(BytesIO(_data), columns, n, fmt, sheet, engine)
+    df = cached_columns(digest, fmt, sheet, engine, tuple(columns), _data)
+    rest = df.iloc[n:]
+    return pd.concat([df.head(n), rest.sample(min(n, len(rest)), random_state=0).sort_index()])
+
+
+# Keyed per template text, so editing one template only re-renders that template's preview
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_preview(template: str, mapping: tuple, blank_fill: str, rows_key: tuple, _rows: pd.DataFrame) -> list[str]:
+    return list(render_frame(CompiledTemplate(template, dict(mapping)), _rows, blank_fill))
+
+
+def merge_preview(
+    uploaded,
+    fmt: str,
+    sheet: str | int,
+    engine: str,
+    stream_upload: bool,
+    blank_fill: str,
+    groups: list[tuple[str, list[str]]],
+):
+    """Renders every template variant over the first N (and a random sample of) rows."""
+    cols = st.columns(2)
+    with cols[0]:
+        n = int(st.number_input("Rows", min_value=1, max_value=50, value=5))
+    with cols[1]:
+        # A disabled checkbox keeps returning its last value
+        sample = st.checkbox(
+            "Add a random sample",
+            value=False,
+            disabled=stream_upload,
+            help="Needs the whole file parsed, so it is off in low-memory mode.",
+        ) and not stream_upload
+
+    digest = upload_digest(uploaded)
+    try:
+        columns, header_map = cached_header(digest, fmt, sheet, engine, uploaded.getvalue())
+        with st.spinner("Reading spreadsheet…"):
+            rows = cached_preview_rows(digest, fmt, sheet, engine, n, sample, uploaded.getvalue())
+    except Exception as e:
+        st.error(f"Could not read {uploaded.name}: {e}")
+        return
+
+    email_col = find_email_column(pd.DataFrame(columns=columns))
+    row_numbers = [i + 2 for i in rows.index]  # Spreadsheet row numbers (row 1 is headers)
+    rows_key = (digest, fmt, sheet, engine, n, sample)
+
+    tabs = st.tabs([title for title, _ in groups])
+    for tab, (title, templates) in zip(tabs, groups):
+        with tab:
+            if not templates:
+                st.caption(f"No {title.lower()} templates.")
+            for i, template in enumerate(templates):
+                mapping, missing = validate_mappings([template], header_map)
+                st.markdown(f"**{title} {chr(65 + i)}**")
+                if missing:
+                    st.warning("Unmapped: " + ", ".join(f"{{{{{ph}}}}}" for ph in missing))
+                rendered = cached_preview(template, tuple(sorted(mapping.items())), blank_fill, rows_key, rows)
+                preview = {"Row": row_numbers}
+                if email_col:
+                    preview["Email address"] = list(email_column_text(rows[email_col]))
+                preview[title] = rendered
+                st.dataframe(pd.DataFrame(preview), hide_index=True, use_container_width=True)
+
+
+@st.cache_resource
+def result_cache() -> ResultCache:
+    # One cache per server process, shared by every session
+    max_mb = int(st.secrets.get("RESULT_CACHE_MB", 256))
+    spill_dir = st.secrets.get("RESULT_CACHE_DIR", "") or None
+    spill_mb = st.secrets.get("RESULT_CACHE_DIR_MB")
+    return ResultCache(
+        max_bytes=max_mb * 1024 * 1024,
+        spill_dir=spill_dir,
+        max_spill_bytes=int(spill_mb) * 1024 * 1024 if spill_mb else None,
+    )
+
+
+@st.cache_resource
+def parsed_uploads() -> ResultCache:
+    # Needed columns of recent uploads as parsed by the job thread (which must not call st.cache_data)
+    return ResultCache(
+        max_bytes=int(st.secrets.get("PARSED_CACHE_MB", 512)) * 1024 * 1024,
+        sizeof=lambda df: int(df.memory_usage(index=False, deep=True).sum()),
+    )
+
+
+@st.cache_resource
+def column_cache() -> ResultCache:
+    # Rendered subject/body/chaser columns of recent lists, so editing one role re-renders only that column
+    return ResultCache(max_bytes=int(st.secrets.get("COLUMN_CACHE_MB", 256)) * 1024 * 1024, sizeof=column_bytes)
+
+
+@st.cache_resource
+def row_snapshots() -> ResultCache:
+    # Per-row hashes and copy of the last generation of each file name + templates, for comparing re-exports
+    spill_dir = st.secrets.get("ROW_SNAPSHOT_DIR", "") or None
+    return ResultCache(
+        max_bytes=int(st.secrets.get("ROW_SNAPSHOT_MB", 256)) * 1024 * 1024,
+        spill_dir=spill_dir,
+        sizeof=lambda snapshot: snapshot.nbytes,
+    )
+
+
+@st.cache_resource
+def job_scheduler() -> AdmissionScheduler:
+    # One queue per server process: caps concurrent generations and their estimated memory
+    budget_mb = st.secrets.get("JOB_MEMORY_BUDGET_MB")
+    return AdmissionScheduler(
+        max_concurrent=int(st.secrets.get("MAX_CONCURRENT_JOBS", 2)),
+        memory_budget=int(budget_mb) * 1024 * 1024 if budget_mb else None,
+    )
+
+
+def diagnostics_log() -> logging.Logger:
+    # JSON lines on stderr unless the deployment configures its own handlers
+    log = logging.getLogger("outreach.diagnostics")
+    if not log.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+        log.propagate = False
+    return log
+
+
+JOB_KEY = "generation_job"
+
+
+def job_memory(data: bytes, fmt: str) -> int:
+    # Scheduler estimate for one input; gzipped CSV expands several times more than plain CSV
+    return estimate_job_bytes(len(data), "csv.gz" if fmt == "csv" and is_gzip(BytesIO(data)) else fmt)
+
+
+def read_upload(parsed: ResultCache, job: GenerationJob, plan: MergePlan, data: bytes, fmt, sheet, engine) -> pd.DataFrame:
+    # The needed columns of the upload, parsed once per content hash (+ format, sheet, reader, columns)
+    key = ResultCache.key(job.meta["digest"], fmt, sheet, engine, plan.needed)
+    df = parsed.get(key)
+    if df is None:
+        df = read_columns(BytesIO(data), list(plan.needed), fmt, sheet, engine)
+        parsed.put(key, df)
+    return df
+
+
+# Job meta a result is shown with, cached alongside it so repeat clicks still report it
+RESULT_STATS = ("appended", "changes")
+
+# Outputs are written to a spooled temp file: in memory up to this size, then on disk
+SPOOL_MAX_BYTES = 64 * 1024 * 1024
+
+
+def generate_output(
+    job: GenerationJob,
+    plan: MergePlan,
+    source: LeadStream | bytes,
+    fmt: str,
+    sheet: str | int,
+    engine: str,
+    blank_fill: str,
+    workers: int,
+    cache: ResultCache,
+    result_key: str,
+    columns: ResultCache,
+    parsed: ResultCache,
+    snapshots: ResultCache | None = None,
+    tracker: tuple[bytes, str] | None = None,
+) -> tuple[int, bytes]:
+    """Runs on the job thread: parse (unless streaming), merge and write the output file in
+    job.meta["output_format"], reporting merged rows to the job. Returns (rows, file bytes)
+    and caches them. The caches are passed in, resolved on the script thread: nothing here
+    may call Streamlit. Parsed uploads come from `parsed` (parsed_uploads()), and parsed
+    lists also reuse rendered columns from `columns` (column_cache()),
+    or, given `snapshots` (row_snapshots()), only re-render the rows changed since the last run.
+    Given a `tracker` (file bytes, format), its rows are kept and only new leads are appended.
+    """
+    timer = job.meta["timer"]
+    out_fmt = job.meta["output_format"]
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    member = job.meta["output_name"].rsplit(".", 1)[0] + ".csv"
+
+    def write(chunks):
+        return write_outreach(spool, track_rows(chunks, job), out_fmt, member)
+
+    if tracker is not None:
+        job.status = "Reading tracker"
+        try:
+            with timer.stage("read tracker"):
+                existing = read_tracker(BytesIO(tracker[0]), tracker[1])
+            if isinstance(source, LeadStream):
+                job.meta["engine"] = source.engine
+                if job.total_rows:
+                    job.total_rows += len(existing)
+                leads = source
+            else:
+                with timer.stage("read rows"):
+                    df = read_upload(parsed, job, plan, source, fmt, sheet, engine)
+                job.meta["engine"] = df.attrs.get("engine")
+                job.total_rows = len(existing) + len(df)
+                leads = frame_chunks(df, PROGRESS_CHUNK_ROWS)
+            # Old rows are written back as they are; only leads with a new email are merged, and
+            # the ones skipped still count towards the progress total
+            new_leads = LeadFilter(existing["Email address"])
+            job.status = "Appending new leads"
+            with timer.stage(f"append + write {out_fmt}"):
+                n_rows = write(
+                    append_chunks(
+                        plan, existing, new_leads.filter(leads, plan.email_col, job.advance), blank_fill, PROGRESS_CHUNK_ROWS
+                    )
+                )
+        except JobCancelled:
+            raise
+        except Exception as e:
+            raise ValueError(f"Could not append to the tracker: {e}") from e
+        job.meta["appended"] = {"tracker_rows": len(existing), "added": new_leads.kept, "skipped": new_leads.skipped}
+    elif isinstance(source, LeadStream):
+        job.meta["engine"] = source.engine
+        job.status = "Reading, merging and writing"
+        try:
+            with timer.stage(f"read rows + merge + write {out_fmt} (streamed)"):
+                n_rows = write(plan.merge_chunks(source, blank_fill))
+        except JobCancelled:
+            raise
+        except Exception as e:
+            raise ValueError(f"Could not read the lead list: {e}") from e
+    else:
+        job.status = "Reading spreadsheet"
+        try:
+            with timer.stage("read rows"):
+                df = read_upload(parsed, job, plan, source, fmt, sheet, engine)
+        except Exception as e:
+            raise ValueError(f"Could not read the lead list: {e}") from e
+        job.meta["engine"] = df.attrs.get("engine")
+        job.total_rows = len(df)
+        job.check_cancelled()
+
+        # Rendered columns from an earlier generation of this list (same templates for that role);
+        # comparing with the last run carries over unchanged rows instead
+        source_key = ResultCache.key(job.meta["digest"], fmt, sheet, engine)
+        reused = [] if snapshots is not None else plan.cached_columns(columns, source_key, blank_fill)
+        job.meta["reused_columns"] = list(reused)
+
+        if snapshots is not None:
+            # Same file name, mapping, templates and blank fill as an earlier run → compare row by row
+            snapshot_key = ResultCache.key(
+                job.meta["upload_name"],
+                sheet,
+                sorted(plan.mapping.items()),
+                plan.email_col,
+                [[t.template for t in getattr(plan, role)] for role in RENDERED_ROLES.values()],
+                blank_fill,
+            )
+            previous = snapshots.get(snapshot_key)
+            job.status = "Comparing with the last run"
+            with timer.stage("merge (changed rows)"):
+                out_df, snapshot, changes = merge_incremental(plan, df, blank_fill, previous)
+            snapshots.put(snapshot_key, snapshot)
+            job.meta["changes"] = asdict(changes) if previous is not None else None
+            job.check_cancelled()
+            job.status = "Writing"
+            with timer.stage(f"write {out_fmt}"):
+                n_rows = write(frame_chunks(out_df, PROGRESS_CHUNK_ROWS))
+            del out_df
+        elif workers > 1 and len(df) >= PARALLEL_MIN_ROWS and not job.meta["reused_columns"]:
+            job.status = f"Merging on {workers} processes"
+            with timer.stage("merge"):
+                out_df = merge_parallel(plan, df, blank_fill, workers=workers, progress=job.advance)
+            plan.cache_columns({name: out_df[name].array for name in RENDERED_ROLES}, columns, source_key, blank_fill)
+            job.check_cancelled()
+            job.status = "Writing"
+            job.rows_done = 0
+            with timer.stage(f"write {out_fmt}"):
+                n_rows = write(frame_chunks(out_df, PROGRESS_CHUNK_ROWS))
+            del out_df
+        else:
+            # Slices keep the progress bar moving and let a cancel land between them
+            job.status = "Merging and writing"
+            with timer.stage(f"merge + write {out_fmt}"):
+                n_rows = write(
+                    plan.merge_chunks_cached(frame_chunks(df, PROGRESS_CHUNK_ROWS), blank_fill, columns, source_key)
+                )
+
+    with spool:
+        spool.seek(0)
+        output_bytes = spool.read()
+    cache.put(result_key, (n_rows, output_bytes, {name: job.meta[name] for name in RESULT_STATS if name in job.meta}))
+    return n_rows, output_bytes
+
+
+# Polls the running job; a full rerun swaps in the finished view
+@st.fragment(run_every=1)
+def job_progress(job: GenerationJob):
+    if job.finished:
+        st.rerun()
+    if job.state == "queued":
+        text = f"Queued: position {job.queue_position}, waiting for other generations to finish"
+        st.progress(0.0, text="Cancelling…" if job.cancelling else text)
+        if st.button("Cancel", disabled=job.cancelling):
+            job.cancel()
+        return
+    text = "Cancelling…" if job.cancelling else f"{job.status or 'Starting'}…"
+    if job.total_rows:
+        text += f" {job.rows_done:,} / {job.total_rows:,} rows"
+    elif job.rows_done:
+        text += f" {job.rows_done:,} rows"
+    st.progress(job.progress or 0.0, text=text)
+    if st.button("Cancel", disabled=job.cancelling):
+        job.cancel()
+
+
+def job_result(job: GenerationJob):
+    if job.state == "cancelled":
+        st.info("Generation cancelled.")
+        return
+    if job.state == "failed":
+        st.error(str(job.error))
+        return
+
+    n_rows, output_bytes = job.result
+    timer = job.meta["timer"]
+    st.success(f"Done. Generated {n_rows} rows.")
+    if job.meta.get("engine"):
+        st.caption(f"Read with {job.meta['engine']}.")
+    if job.meta.get("reused_columns"):
+        st.caption(f"Reused the rendered {', '.join(job.meta['reused_columns'])} from the last generation.")
+    if job.meta.get("appended"):
+        appended = job.meta["appended"]
+        st.caption(
+            f"Kept the {appended['tracker_rows']:,} rows of {job.meta['tracker_name']} and appended "
+            f"{appended['added']:,} new leads; skipped {appended['skipped']:,} already in it."
+        )
+    if job.meta.get("changes"):
+        changes = job.meta["changes"]
+        st.caption(
+            f"Since the last run of {job.meta['upload_name']}: {changes['added']:,} added, "
+            f"{changes['changed']:,} changed, {changes['removed']:,} removed, "
+            f"{changes['unchanged']:,} unchanged (carried over)."
+        )
+    elif "changes" in job.meta:
+        st.caption(f"No earlier run of {job.meta['upload_name']} with these templates to compare with.")
+    if timer.enabled:
+        with st.expander("Diagnostics", expanded=True):
+            if job.meta["cached"]:
+                st.caption("Served from the result cache.")
+            st.dataframe(pd.DataFrame(timer.stages), hide_index=True, use_container_width=True)
+        if not job.meta.get("logged"):
+            job.meta["logged"] = True
+            timer.log(
+                diagnostics_log(),
+                "generate",
+                rows=n_rows,
+                upload=job.meta["digest"],
+                streamed=job.meta["streamed"],
+                engine=job.meta.get("engine"),
+                cached=job.meta["cached"],
+                reused_columns=job.meta.get("reused_columns", []),
+                changes=job.meta.get("changes"),
+                appended=job.meta.get("appended"),
+                output_bytes=len(output_bytes),
+            )
+    st.download_button(
+        label="Download List",
+        data=output_bytes,
+        file_name=job.meta["output_name"],
+        mime=OUTPUT_FORMATS[job.meta["output_format"]][1],
+    )
+
+
 st.set_page_config(page_title="Outreach Merge Tool", layout="centered")
 st.title("Outreach Merge Tool")
 
@@ -118,7 +495,40 @@ with st.expander("Access", expanded=True):
         st.warning("Enter the team password to use the tool.")
         st.stop()
 
-uploaded = st.file_uploader("Upload Excel (.xlsx)", type=["xlsx"])
+uploaded = st.file_uploader(
+    "Upload lead list (.xlsx, .csv, .csv.gz or .parquet)", type=["xlsx", "csv", "gz", "parquet"]
+)
+fmt = "xlsx"
+sheet: str | int = 0
+if uploaded is not None:
+    try:
+        fmt = input_format(uploaded.name)
+        sheet_names = cached_sheet_names(upload_digest(uploaded), uploaded.getvalue()) if fmt == "xlsx" else []
+    except Exception as e:
+        st.error(f"Could not read {uploaded.name}: {e}")
+        st.stop()
+    if len(sheet_names) > 1:
+        sheet = st.selectbox("Sheet", sheet_names)
+stream_upload = st.checkbox(
+    "Low-memory mode for very large files",
+    help="Reads the spreadsheet in chunks of rows instead of loading it all at once.",
+)
+engine = "openpyxl"
+if fmt == "xlsx":
+    engine_choice = st.selectbox(
+        "Excel reader",
+        EXCEL_ENGINES,
+        format_func={
+            "auto": "Auto (calamine when installed)",
+            "calamine": "calamine (fast)",
+            "openpyxl": "openpyxl (streaming)",
+        }.get,
+        help="calamine parses several times faster but holds the whole sheet in memory, "
+        "so Auto uses openpyxl in low-memory mode. Falls back to openpyxl if calamine is unavailable.",
+    )
+    engine = excel_engine("openpyxl" if stream_upload and engine_choice == "auto" else engine_choice)
+    if engine_choice == "calamine" and engine != "calamine":
+        st.caption("python-calamine is not installed; reading with openpyxl.")
 blank_fill = st.text_input("Blank cell replacement", value="[MISSING]")
 st.caption("If a cell is blank/empty, it becomes the value above (use empty string if you prefer).")
 
@@ -143,135 +553,171 @@ chaser_templates = template_editor(
     help_text="Optional follow-up copy. If multiple are provided, rotates A → B → A…",
 )
 
+if uploaded is not None and st.toggle("Live preview", help="Render the first rows for every template variant."):
+    merge_preview(
+        uploaded,
+        fmt,
+        sheet,
+        engine,
+        stream_upload,
+        blank_fill,
+        [("Subject line", subject_templates), ("Email Copy", email_templates), ("Chaser copy", chaser_templates)],
+    )
+
+output_format = st.radio(
+    "Output format",
+    list(OUTPUT_FORMATS),
+    format_func={
+        "xlsx": "Excel (.xlsx)",
+        "csv": "CSV (.csv)",
+        "zip": "Zipped CSV (.zip)",
+        "parquet": "Parquet (.parquet)",
+    }.get,
+    horizontal=True,
+    help="CSV and Parquet are much faster to produce for very large lists, but have no Yes/No dropdowns.",
+)
+output_ext = OUTPUT_FORMATS[output_format][0]
+
 output_name = st.text_input(
     "Output file name",
     value="outreach_output.xlsx",
-    help="Must end with .xlsx"
+    help="The extension follows the output format"
 ).strip()
 
-if not output_name.lower().endswith(".xlsx"):
-    output_name += ".xlsx"
+for ext, _ in OUTPUT_FORMATS.values():
+    if output_name.lower().endswith(ext):
+        output_name = output_name[: -len(ext)]
+output_name = (output_name or "outreach_output") + output_ext
 
-run = st.button(
-    "Generate output XLSX",
-    type="primary",
-    disabled=(uploaded is None or len(subject_templates) == 0 or len(email_templates) == 0),
+tracker_upload = st.file_uploader(
+    "Existing tracker to append to (optional)",
+    type=["xlsx", "csv", "gz", "parquet"],
+    help="An earlier output with your sent marks and statuses. Its rows are kept as they are, and only leads "
+    "whose email is not in it yet are merged and added below them.",
 )
 
-if run:
-    # Read Excel
-    try:
-        df = pd.read_excel(uploaded, dtype=object)
-    except Exception as e:
-        st.error(f"Could not read Excel: {e}")
-        st.stop()
+compare_runs = st.checkbox(
+    "Only re-render changed rows",
+    disabled=stream_upload or tracker_upload is not None,
+    help="Compares with the last generation of a file with the same name and templates: unchanged rows are "
+    "carried over, and the result counts added, changed and removed rows. Off in low-memory and append mode.",
+) and not stream_upload and tracker_upload is None
 
-    header_map = build_header_map(df)
+diagnostics = st.checkbox(
+    "Show diagnostics",
+    help="Time each generation stage (wall, CPU, peak memory). Tracing memory slows generation down.",
+)
 
-    # Validate placeholders across subject + email + chaser
-    all_templates = subject_templates + email_templates + chaser_templates
-    mapping, missing_placeholders = validate_mappings(all_templates, header_map)
+job = st.session_state.get(JOB_KEY)
+run = st.button(
+    f"Generate output {output_ext[1:].upper()}",
+    type="primary",
+    disabled=(
+        uploaded is None
+        or len(subject_templates) == 0
+        or len(email_templates) == 0
+        or (job is not None and not job.finished)
+    ),
+)
 
-    # Hard stop if any placeholder doesn't map
-    if missing_placeholders:
-        st.error(
-            "Some placeholders do not match any Excel column header (case-insensitive; ignores spaces/underscores)."
+if run:
+    timer = StageTimer(enabled=diagnostics)
+    digest = upload_digest(uploaded)
+    meta = {
+        "timer": timer,
+        "digest": digest,
+        "upload_name": uploaded.name,
+        "streamed": stream_upload,
+        "output_format": output_format,
+        "output_name": output_name,
+    }
+    tracker = None
+    key_extra = []
+    if tracker_upload is not None:
+        meta["tracker_name"] = tracker_upload.name
+        try:
+            tracker = (tracker_upload.getvalue(), input_format(tracker_upload.name))
+        except ValueError as e:
+            st.error(f"Could not read {tracker_upload.name}: {e}")
+            st.stop()
+        key_extra = [hashlib.sha256(tracker[0]).hexdigest()]
+    if output_format == "zip":
+        key_extra.append(output_name)  # names the CSV inside the zip
+    # Same list + same templates + same options (+ same tracker) → serve the workbook built last time
+    result_key = ResultCache.key(
+        digest, sheet, subject_templates, email_templates, chaser_templates, blank_fill, output_format, *key_extra
+    )
+    with timer.stage("result cache lookup"):
+        cached_result = result_cache().get(result_key)
+    if cached_result is not None:
+        n_rows, output_bytes, *stats = cached_result  # entries spilled by older versions have no stats
+        job = GenerationJob(
+            lambda job: (n_rows, output_bytes), total_rows=n_rows, meta={**meta, **dict(*stats), "cached": True}
         )
-        st.code("\n".join([f"UNMAPPED PLACEHOLDER: {{{{{ph}}}}}" for ph in missing_placeholders]))
-        st.stop()
-
-    email_col = find_email_column(df)
-
-    out_email_address: list[str] = []
-    out_subject: list[str] = []
-    out_email_copy: list[str] = []
-    out_email_sent: list[str] = []
-    out_chaser_copy: list[str] = []
-    out_chaser_sent: list[str] = []
-    out_status: list[str] = []
-
-    # Generate (preserve row order)
-    for i in range(len(df)):
-        row = df.iloc[i]
-
-        subj_t = subject_templates[i % len(subject_templates)]
-        body_t = email_templates[i % len(email_templates)]
-        chaser_t = chaser_templates[i % len(chaser_templates)] if len(chaser_templates) > 0 else ""
-
-        subject_line = merge_row(subj_t, row, mapping, blank_fill)
-        email_copy = merge_row(body_t, row, mapping, blank_fill)
-        chaser_copy = merge_row(chaser_t, row, mapping, blank_fill) if chaser_t else ""
-
-        if email_col:
-            v = row.get(email_col, "")
-            out_email_address.append("" if pd.isna(v) else str(v))
+    else:
+        # Read the header row only; data rows are parsed once the needed columns are known
+        try:
+            with timer.stage("read header"):
+                if stream_upload:
+                    stream = open_stream(BytesIO(uploaded.getvalue()), fmt, sheet=sheet, engine=engine)
+                    columns = stream.columns
+                else:
+                    columns = cached_header(digest, fmt, sheet, engine, uploaded.getvalue())[0]
+        except Exception as e:
+            st.error(f"Could not read {uploaded.name}: {e}")
+            st.stop()
+
+        # Validate placeholders across subject + email + chaser; hard stop if any doesn't map
+        try:
+            with timer.stage("mapping"):
+                plan = plan_merge(columns, subject_templates, email_templates, chaser_templates)
+        except UnmappedPlaceholders as e:
+            st.error(
+                "Some placeholders do not match any column header (case-insensitive; ignores spaces/underscores)."
+            )
+            st.code("\n".join([f"UNMAPPED PLACEHOLDER: {{{{{ph}}}}}" for ph in e.placeholders]))
+            st.stop()
+        if tracker is not None and plan.email_col is None:
+            st.error("Appending to a tracker needs an email column in the lead list, to tell new leads apart.")
+            st.stop()
+
+        # Parse only the columns the templates (and the email address) actually use
+        if stream_upload:
+            stream.select_columns(plan.needed)
+            source = stream
         else:
-            out_email_address.append("")
-
-        out_subject.append(subject_line)
-        out_email_copy.append(email_copy)
-        out_email_sent.append("")  # will become a dropdown in Excel
-        out_chaser_copy.append(chaser_copy)
-        out_chaser_sent.append("")  # will become a dropdown in Excel
-        out_status.append("")
-
-    out_df = pd.DataFrame(
-        {
-            "Email address": out_email_address,
-            "Subject line": out_subject,
-            "Email Copy": out_email_copy,
-            "Email Sent?": out_email_sent,
-            "Chaser copy": out_chaser_copy,
-            "Chaser sent?": out_chaser_sent,
-            "Status": out_status,
-        }
-    )
-
-    # Write XLSX to memory (robust on Streamlit Cloud)
-    buffer = BytesIO()
-    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-        out_df.to_excel(writer, index=False, sheet_name="Outreach")
-
-        worksheet = writer.sheets["Outreach"]
-
-        # Optional: nicer widths
-        for col_idx, col_name in enumerate(out_df.columns):
-            sample = out_df[col_name].astype(str).head(50)
-            max_len = max([len(col_name)] + [len(x) for x in sample])
-            worksheet.set_column(col_idx, col_idx, min(max(12, max_len + 2), 60))
-
-        # Excel-native "clickable" sent fields via dropdown validation (reliable)
-        email_sent_col = out_df.columns.get_loc("Email Sent?")
-        chaser_sent_col = out_df.columns.get_loc("Chaser sent?")
-
-        worksheet.set_column(email_sent_col, email_sent_col, 14)
-        worksheet.set_column(chaser_sent_col, chaser_sent_col, 14)
-
-        first_row = 1  # row 0 is headers
-        last_row = len(out_df)  # inclusive last row index in xlsxwriter coordinates
-
-        # Create Yes/No dropdowns
-        worksheet.data_validation(first_row, email_sent_col, last_row, email_sent_col, {
-            "validate": "list",
-            "source": ["No", "Yes"],
-        })
-        worksheet.data_validation(first_row, chaser_sent_col, last_row, chaser_sent_col, {
-            "validate": "list",
-            "source": ["No", "Yes"],
-        })
-
-        # Default all rows to "No" (so it behaves like an unchecked box)
-        for r in range(first_row, last_row + 1):
-            worksheet.write(r, email_sent_col, "No")
-            worksheet.write(r, chaser_sent_col, "No")
-
-    buffer.seek(0)
-
-    st.success(f"Done. Generated {len(out_df)} rows.")
-    st.download_button(
-        label="Download List",
-        data=buffer.getvalue(),
-        file_name=output_name,
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    )
+            source = uploaded.getvalue()
+        workers = int(st.secrets.get("MERGE_WORKERS", 0)) or default_workers()
+        # Resolved here: cache_resource accessors draw a spinner, which the job thread must not
+        results, rendered, parsed = result_cache(), column_cache(), parsed_uploads()
+        snapshots = row_snapshots() if compare_runs else None
+        job = GenerationJob(
+            lambda job: generate_output(
+                job,
+                plan,
+                source,
+                fmt,
+                sheet,
+                engine,
+                blank_fill,
+                workers,
+                results,
+                result_key,
+                rendered,
+                parsed,
+                snapshots,
+                tracker,
+            ),
+            total_rows=stream.estimated_rows if stream_upload else None,
+            meta={**meta, "cached": False},
+            scheduler=job_scheduler(),
+            # The tracker's rows are held and written again too, so it counts towards the estimate
+            estimated_bytes=job_memory(uploaded.getvalue(), fmt) + (job_memory(*tracker) if tracker else 0),
+        )
+    st.session_state[JOB_KEY] = job.start()
 
+if job is not None:
+    if job.finished:
+        job_result(job)
+    else:
+        job_progress(job)
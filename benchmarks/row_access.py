@@ -0,0 +1,57 @@
+"""Row loop benchmark: df.iloc[i] rows vs ColumnarRows tuples (vs the vectorized merge).
+
+    python -m benchmarks.row_access --rows 100000
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import LeadSpec, make_leads, make_templates
+from outreach import merge_frame, merge_frame_rows, plan_merge
+
+
+def merge_frame_iloc(df, subject_compiled, email_compiled, chaser_compiled, email_col, blank_fill):
+    # The pre-ColumnarRows generate loop: one pandas Series per row via df.iloc[i]
+    out = []
+    for i in range(len(df)):
+        row = df.iloc[i]
+        subj_t = subject_compiled[i % len(subject_compiled)]
+        body_t = email_compiled[i % len(email_compiled)]
+        chaser_t = chaser_compiled[i % len(chaser_compiled)] if chaser_compiled else None
+        v = row.get(email_col, "") if email_col else ""
+        out.append((
+            "" if pd.isna(v) else str(v),
+            subj_t.render(row, blank_fill),
+            body_t.render(row, blank_fill),
+            chaser_t.render(row, blank_fill) if chaser_t else "",
+        ))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    spec = LeadSpec(rows=args.rows)
+    df = make_leads(spec)
+    plan = plan_merge(list(df.columns), *make_templates(spec))
+
+    for name, fn in [
+        ("iloc rows", merge_frame_iloc),
+        ("columnar rows", merge_frame_rows),
+        ("vectorized", merge_frame),
+    ]:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn(df, plan.subject, plan.email, plan.chaser, plan.email_col, "[MISSING]")
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:<14} {best:8.3f}s  ({args.rows / best:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
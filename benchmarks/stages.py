@@ -0,0 +1,177 @@
+"""Per-stage timings of the merge pipeline on synthetic lead lists.
+
+    python -m benchmarks.stages --rows 1000 100000 1000000
+    python -m benchmarks.stages --rows 100000 --columns 80 --blank-ratio 0.2 --stages merge frame
+    python -m benchmarks.stages --rows 100000 --stages excel_read --excel-engines openpyxl calamine
+
+Stages: excel_read (header + needed columns, once per --excel-engines entry), mapping (plan_merge),
+merge (merge_columns), frame (output DataFrame build), compact_frame (the same as
+Categorical/string[pyarrow] columns), compact_frame_arrow (compact_frame of Arrow-backed columns, as
+merge_parallel assembles them), xlsx_write (write_outreach_xlsx), csv_write (write_outreach_csv).
+Every run appends one JSON line per list size to --results, so numbers can be compared across
+commits.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import LeadSpec, make_leads, make_templates
+from outreach import (
+    OUTPUT_COLUMNS,
+    compact_frame,
+    excel_engine,
+    merge_columns,
+    plan_merge,
+    read_excel_columns,
+    read_excel_header,
+    write_outreach_csv,
+    write_outreach_xlsx,
+)
+
+STAGES = ["excel_read", "mapping", "merge", "frame", "compact_frame", "compact_frame_arrow", "xlsx_write", "csv_write"]
+DEFAULT_RESULTS = Path(__file__).with_name("results.jsonl")
+
+
+def write_input_xlsx(df: pd.DataFrame, path: Path) -> None:
+    # Untimed setup; constant_memory keeps 1M-row inputs writable
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(str(path), {"constant_memory": True})
+    worksheet = workbook.add_worksheet()
+    worksheet.write_row(0, 0, list(df.columns))
+    for r, values in enumerate(df.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(r, 0, ["" if v is None else v for v in values])
+    workbook.close()
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def best_of(repeat: int, fn):
+    # (best wall seconds, last result)
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_stages(
+    spec: LeadSpec, stages: list[str], repeat: int, workdir: Path, engines: list[str] = ("openpyxl",)
+) -> dict[str, float]:
+    df = make_leads(spec)
+    subjects, bodies, chasers = make_templates(spec)
+    blank_fill = "[MISSING]"
+    timings: dict[str, float] = {}
+
+    plan = plan_merge(list(df.columns), subjects, bodies, chasers)
+    if "excel_read" in stages:
+        path = workdir / f"leads_{spec.rows}.xlsx"
+        write_input_xlsx(df, path)
+
+        def read(engine: str):
+            header = read_excel_header(path, engine=engine)
+            return read_excel_columns(path, plan_merge(header, subjects, bodies, chasers).needed, engine=engine)
+
+        for engine in engines:
+            # Same file through each reader; keys name the engine so results stay comparable
+            timings[f"excel_read_{engine}"], df = best_of(repeat, lambda: read(engine))
+
+    if "mapping" in stages:
+        timings["mapping"], plan = best_of(repeat, lambda: plan_merge(list(df.columns), subjects, bodies, chasers))
+
+    def merge():
+        return merge_columns(df, plan.subject, plan.email, plan.chaser, plan.email_col, blank_fill)
+
+    seconds, columns = best_of(repeat, merge)
+    if "merge" in stages:
+        timings["merge"] = seconds
+
+    seconds, out_df = best_of(repeat, lambda: pd.DataFrame(columns, columns=OUTPUT_COLUMNS))
+    if "frame" in stages:
+        timings["frame"] = seconds
+
+    if "compact_frame" in stages:
+        timings["compact_frame"], _ = best_of(repeat, lambda: compact_frame(columns))
+
+    if "compact_frame_arrow" in stages:
+        import pyarrow as pa
+
+        arrow_columns = {
+            name: pd.Series(pa.chunked_array([pa.array(values, type=pa.large_string())]), dtype=pd.ArrowDtype(pa.large_string())).array
+            for name, values in columns.items()
+        }
+        timings["compact_frame_arrow"], _ = best_of(repeat, lambda: compact_frame(arrow_columns))
+
+    if "xlsx_write" in stages:
+        timings["xlsx_write"], _ = best_of(repeat, lambda: write_outreach_xlsx(BytesIO(), [out_df]))
+
+    if "csv_write" in stages:
+        timings["csv_write"], _ = best_of(repeat, lambda: write_outreach_csv(BytesIO(), [out_df]))
+
+    return timings
+
+
+def main() -> None:
+    defaults = LeadSpec()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--columns", type=int, default=defaults.columns)
+    parser.add_argument("--blank-ratio", type=float, default=defaults.blank_ratio)
+    parser.add_argument("--value-length", type=int, default=defaults.value_length)
+    parser.add_argument("--cardinality", type=int, default=defaults.cardinality)
+    parser.add_argument("--templates", type=int, default=defaults.templates)
+    parser.add_argument("--placeholders", type=int, default=defaults.placeholders)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument(
+        "--excel-engines", nargs="+", choices=["openpyxl", "calamine"], default=["openpyxl", "calamine"],
+        help="readers to time for excel_read (uninstalled ones are skipped)",
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--results", type=Path, default=DEFAULT_RESULTS, help="JSON lines file to append to")
+    args = parser.parse_args()
+
+    meta = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+    }
+
+    engines = [engine for engine in args.excel_engines if excel_engine(engine) == engine]
+    for engine in sorted(set(args.excel_engines) - set(engines)):
+        print(f"skipping excel_read_{engine}: not installed")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            spec = LeadSpec(
+                rows=rows,
+                columns=args.columns,
+                blank_ratio=args.blank_ratio,
+                value_length=args.value_length,
+                cardinality=args.cardinality,
+                templates=args.templates,
+                placeholders=args.placeholders,
+            )
+            timings = run_stages(spec, args.stages, args.repeat, Path(tmp), engines)
+            print(f"{rows:>10,} rows  " + "  ".join(f"{k} {v:8.3f}s" for k, v in timings.items()))
+            with open(args.results, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps({**meta, "spec": spec.as_dict(), "seconds": timings}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Synthetic lead lists and templates for the benchmarks."""
+
+import random
+import string
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+FILLER = "We help teams like yours cut the busywork out of outbound so reps spend time on replies".split()
+
+
+@dataclass
+class LeadSpec:
+    rows: int = 1_000
+    columns: int = 12  # including Email; CRM exports are often 80+
+    blank_ratio: float = 0.05
+    value_length: int = 12  # average characters per text cell
+    cardinality: int = 1_000  # distinct values per column (low = repetitive niches/cities)
+    templates: int = 2  # variants per role (subject, email, chaser)
+    placeholders: int = 3  # placeholders per template
+    seed: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def column_names(spec: LeadSpec) -> list[str]:
+    # "Email" first, then "Field 1".."Field n" (headers use spaces, placeholders use underscores)
+    return ["Email"] + [f"Field {i}" for i in range(1, spec.columns)]
+
+
+def make_leads(spec: LeadSpec) -> pd.DataFrame:
+    rng = np.random.default_rng(spec.seed)
+    data: dict[str, np.ndarray] = {
+        "Email": np.array([f"lead{i}@example.com" for i in range(spec.rows)], dtype=object)
+    }
+
+    letters = np.array(list(string.ascii_lowercase))
+    for name in column_names(spec)[1:]:
+        lengths = rng.integers(max(1, spec.value_length // 2), spec.value_length * 3 // 2 + 1, spec.cardinality)
+        vocab = np.array(["".join(rng.choice(letters, n)) for n in lengths], dtype=object)
+        values = vocab[rng.integers(0, spec.cardinality, spec.rows)]
+        values[rng.random(spec.rows) < spec.blank_ratio] = None
+        data[name] = values
+
+    return pd.DataFrame(data, dtype=object)
+
+
+def make_templates(spec: LeadSpec) -> tuple[list[str], list[str], list[str]]:
+    # (subject, email, chaser) variants, each with `placeholders` placeholders among filler words
+    rng = random.Random(spec.seed)
+    fields = [f"field_{i}" for i in range(1, spec.columns)] or ["email"]
+
+    def template(words: int) -> str:
+        parts = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(spec.placeholders):
+            parts.insert(rng.randrange(len(parts) + 1), "{{" + rng.choice(fields) + "}}")
+        return " ".join(parts)
+
+    subjects = [template(5) for _ in range(spec.templates)]
+    bodies = [template(60) for _ in range(spec.templates)]
+    chasers = [template(20) for _ in range(spec.templates)]
+    return subjects, bodies, chasers
@@ -0,0 +1,164 @@
+"""Streamlit-free merge engine behind the Outreach Merge Tool."""
+
+from outreach.cache import ResultCache
+from outreach.diagnostics import StageTimer
+from outreach.export import (
+    OUTPUT_FORMATS,
+    XLSX_MIME,
+    write_outreach,
+    write_outreach_csv,
+    write_outreach_parquet,
+    write_outreach_xlsx,
+    write_outreach_zip,
+)
+from outreach.incremental import RowChanges, RowSnapshot, match_rows, merge_incremental, row_hashes
+from outreach.ingest import (
+    EXCEL_ENGINES,
+    CsvStream,
+    ExcelStream,
+    LeadStream,
+    ParquetStream,
+    excel_cell,
+    excel_engine,
+    excel_sheet_names,
+    excel_sheets_with_data,
+    header_names,
+    input_format,
+    is_gzip,
+    open_stream,
+    parquet_cell_text,
+    read_columns,
+    read_excel_columns,
+    read_excel_head,
+    read_excel_header,
+    read_head,
+    read_header,
+)
+from outreach.jobs import PROGRESS_CHUNK_ROWS, GenerationJob, JobCancelled, track_rows
+from outreach.merge import (
+    COMPACT_SAMPLE_ROWS,
+    DISTINCT_RENDER_RATIO,
+    OUTPUT_COLUMNS,
+    PLACEHOLDER_RE,
+    RENDER_MEMO_CHARS,
+    ColumnarRows,
+    CompiledTemplate,
+    RenderMemo,
+    arrow_strings,
+    build_header_map,
+    cell_text,
+    clean_column,
+    column_bytes,
+    compact_arrow_column,
+    compact_column,
+    compact_frame,
+    email_column_text,
+    extract_placeholders,
+    find_email_column,
+    frame_chunks,
+    merge_chunks,
+    merge_columns,
+    merge_frame,
+    merge_frame_rows,
+    merge_row,
+    needed_columns,
+    norm_key,
+    render_at,
+    render_frame,
+    render_rotated,
+    validate_mappings,
+    value_codes,
+    value_combinations,
+)
+from outreach.parallel import PARALLEL_MIN_ROWS, default_workers, merge_parallel
+from outreach.pipeline import RENDERED_ROLES, MergePlan, UnmappedPlaceholders, plan_merge
+from outreach.scheduler import MEMORY_PER_UPLOAD_BYTE, AdmissionScheduler, estimate_job_bytes
+from outreach.tracker import LeadFilter, append_chunks, normalized_emails, read_tracker
+
+__all__ = [
+    "COMPACT_SAMPLE_ROWS",
+    "DISTINCT_RENDER_RATIO",
+    "EXCEL_ENGINES",
+    "MEMORY_PER_UPLOAD_BYTE",
+    "OUTPUT_COLUMNS",
+    "OUTPUT_FORMATS",
+    "PARALLEL_MIN_ROWS",
+    "PLACEHOLDER_RE",
+    "PROGRESS_CHUNK_ROWS",
+    "RENDERED_ROLES",
+    "RENDER_MEMO_CHARS",
+    "XLSX_MIME",
+    "AdmissionScheduler",
+    "ColumnarRows",
+    "CompiledTemplate",
+    "CsvStream",
+    "ExcelStream",
+    "GenerationJob",
+    "JobCancelled",
+    "LeadFilter",
+    "LeadStream",
+    "MergePlan",
+    "ParquetStream",
+    "RenderMemo",
+    "ResultCache",
+    "RowChanges",
+    "RowSnapshot",
+    "StageTimer",
+    "UnmappedPlaceholders",
+    "append_chunks",
+    "arrow_strings",
+    "build_header_map",
+    "cell_text",
+    "clean_column",
+    "column_bytes",
+    "compact_arrow_column",
+    "compact_column",
+    "compact_frame",
+    "default_workers",
+    "email_column_text",
+    "estimate_job_bytes",
+    "excel_cell",
+    "excel_engine",
+    "excel_sheet_names",
+    "excel_sheets_with_data",
+    "extract_placeholders",
+    "find_email_column",
+    "frame_chunks",
+    "header_names",
+    "input_format",
+    "is_gzip",
+    "match_rows",
+    "merge_chunks",
+    "merge_columns",
+    "merge_frame",
+    "merge_frame_rows",
+    "merge_incremental",
+    "merge_parallel",
+    "merge_row",
+    "needed_columns",
+    "norm_key",
+    "normalized_emails",
+    "open_stream",
+    "parquet_cell_text",
+    "plan_merge",
+    "read_columns",
+    "read_excel_columns",
+    "read_excel_head",
+    "read_excel_header",
+    "read_head",
+    "read_header",
+    "read_tracker",
+    "render_at",
+    "render_frame",
+    "render_rotated",
+    "row_hashes",
+    "track_rows",
+    "validate_mappings",
+    "value_codes",
+    "value_combinations",
+    "write_outreach",
+    "write_outreach_csv",
+    "write_outreach_parquet",
+    "write_outreach_xlsx",
+    "write_outreach_zip",
+]
@@ -0,0 +1,90 @@
+"""Headless batch merge, same engine as the Streamlit app but without importing Streamlit.
+
+    python -m outreach leads.xlsx outreach_output.xlsx --subject subject_a.txt --subject subject_b.txt \
+        --email body_a.txt --chaser chaser.txt --blank-fill "[MISSING]"
+
+Each template file holds one template; repeat a flag to rotate A → B → A… across rows.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from outreach.export import OUTPUT_FORMATS, write_outreach
+from outreach.ingest import DEFAULT_CHUNK_ROWS, input_format, open_stream
+from outreach.pipeline import UnmappedPlaceholders, plan_merge
+from outreach.tracker import LeadFilter, append_chunks, read_tracker
+
+
+def read_templates(paths: list[str]) -> list[str]:
+    templates = [Path(p).read_text(encoding="utf-8").strip() for p in paths]
+    return [t for t in templates if t]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m outreach", description="Merge a lead list into outreach copy.")
+    parser.add_argument("input", help="lead list (.xlsx, .csv, .csv.gz or .parquet) with headers in the first row")
+    parser.add_argument("output", help="output path; .xlsx, .csv, .zip (zipped CSV) or .parquet by extension")
+    parser.add_argument("--subject", action="append", required=True, metavar="FILE", help="subject line template file")
+    parser.add_argument("--email", action="append", required=True, metavar="FILE", help="email copy template file")
+    parser.add_argument("--chaser", action="append", default=[], metavar="FILE", help="chaser copy template file")
+    parser.add_argument("--blank-fill", default="[MISSING]", help="replacement for blank cells (default: %(default)s)")
+    parser.add_argument("--sheet", help="sheet name to read (default: first sheet)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="rows per streamed chunk")
+    parser.add_argument(
+        "--append", metavar="TRACKER",
+        help="earlier output to keep as it is; only leads whose email is not in it are merged and appended",
+    )
+    args = parser.parse_args(argv)
+
+    out_fmt = next((fmt for fmt, (ext, _) in OUTPUT_FORMATS.items() if args.output.lower().endswith(ext)), None)
+    if out_fmt is None:
+        parser.error("output must end with " + ", ".join(ext for ext, _ in OUTPUT_FORMATS.values()))
+
+    subject_templates = read_templates(args.subject)
+    email_templates = read_templates(args.email)
+    chaser_templates = read_templates(args.chaser)
+    if not subject_templates or not email_templates:
+        parser.error("at least one non-empty subject and email template is required")
+
+    try:
+        fmt = input_format(args.input)
+        stream = open_stream(args.input, fmt, chunk_rows=args.chunk_rows, sheet=args.sheet if args.sheet else 0)
+        columns = stream.columns
+    except Exception as e:
+        print(f"Could not read {args.input}: {e}", file=sys.stderr)
+        return 1
+
+    try:
+        plan = plan_merge(columns, subject_templates, email_templates, chaser_templates)
+    except UnmappedPlaceholders as e:
+        print("Some placeholders do not match any column header (case-insensitive; ignores spaces/underscores).", file=sys.stderr)
+        for ph in e.placeholders:
+            print(f"UNMAPPED PLACEHOLDER: {{{{{ph}}}}}", file=sys.stderr)
+        return 2
+
+    # Parse only the columns the templates (and the email address) actually use
+    stream.select_columns(plan.needed)
+    chunks = plan.merge_chunks(stream, args.blank_fill)
+    if args.append:
+        if plan.email_col is None:
+            print("--append needs an email column in the lead list", file=sys.stderr)
+            return 1
+        try:
+            tracker = read_tracker(args.append, input_format(args.append))
+        except Exception as e:
+            print(f"Could not read {args.append}: {e}", file=sys.stderr)
+            return 1
+        new_leads = LeadFilter(tracker["Email address"])
+        chunks = append_chunks(plan, tracker, new_leads.filter(stream, plan.email_col), args.blank_fill, args.chunk_rows)
+
+    member = Path(args.output).with_suffix(".csv").name
+    n_rows = write_outreach(args.output, chunks, out_fmt, member)
+    print(f"Generated {n_rows} rows -> {args.output}")
+    if args.append:
+        print(f"Kept {len(tracker)} tracker rows, appended {new_leads.kept} new leads, skipped {new_leads.skipped}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
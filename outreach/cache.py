@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+
+
+class ResultCache:
+    """Thread-safe LRU of generated outputs, bounded by total payload bytes.
+    Values are (rows, data, …) tuples, unless `sizeof` is given to measure other values
+    (e.g. rendered columns). When `spill_dir` is set, entries evicted from memory
+    are written there and served from disk on later hits (promoting them back into
+    memory); the spill directory is itself trimmed oldest-first to `max_spill_bytes`.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        spill_dir: str | None = None,
+        max_spill_bytes: int | None = None,
+        sizeof: Callable[[object], int] | None = None,
+    ):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        self.sizeof = sizeof or (lambda value: len(value[1]))
+        self._entries: OrderedDict[str, object] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    @staticmethod
+    def key(*parts) -> str:
+        # Stable digest of JSON-able key parts (strings, numbers, lists of templates…)
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key: str) -> object | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                return value
+
+        value = self._read_spill(key)
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    def put(self, key: str, value: object) -> None:
+        size = self.sizeof(value)
+        evicted: list[tuple[str, object]] = []
+        with self._lock:
+            if key in self._entries:
+                self._size -= self.sizeof(self._entries.pop(key))
+            self._entries[key] = value
+            self._size += size
+            while self._size > self.max_bytes and self._entries:
+                old_key, old_value = self._entries.popitem(last=False)
+                self._size -= self.sizeof(old_value)
+                evicted.append((old_key, old_value))
+
+        for old_key, old_value in evicted:
+            self._write_spill(old_key, old_value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    # ---------------- disk spill ----------------
+
+    def _spill_path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, f"{key}.pkl")
+
+    def _read_spill(self, key: str) -> object | None:
+        if not self.spill_dir:
+            return None
+        try:
+            with open(self._spill_path(key), "rb") as fh:
+                return pickle.load(fh)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _write_spill(self, key: str, value: object) -> None:
+        if not self.spill_dir or os.path.exists(self._spill_path(key)):
+            return
+        try:
+            # Write-then-rename so other sessions never read a half-written entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.spill_dir, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._spill_path(key))
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            # Unpicklable values (or a full disk) are just not spilled
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self._trim_spill()
+
+    def _trim_spill(self) -> None:
+        if self.max_spill_bytes is None:
+            return
+        try:
+            entries = [
+                (e.stat().st_mtime, e.stat().st_size, e.path)
+                for e in os.scandir(self.spill_dir)
+                if e.name.endswith(".pkl")
+            ]
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_spill_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,85 @@
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class _SharedTracing:
+    # tracemalloc is process-wide and concurrent jobs each run a timer: tracing starts with the
+    # first open stage and stops with the last, and the peak is only reset while no other is open
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.open = 0
+        self.entered = 0
+        self.started = False
+
+    def enter(self) -> tuple[int, int, bool]:
+        # (traced bytes now, entry number, whether another stage is open)
+        with self.lock:
+            if self.open == 0:
+                if tracemalloc.is_tracing():
+                    tracemalloc.reset_peak()
+                else:
+                    tracemalloc.start()
+                    self.started = True
+            self.open += 1
+            self.entered += 1
+            return tracemalloc.get_traced_memory()[0], self.entered, self.open > 1
+
+    def exit(self, entry: int) -> tuple[int, bool]:
+        # (peak traced bytes, whether another stage was entered since `entry`)
+        with self.lock:
+            peak = tracemalloc.get_traced_memory()[1]
+            self.open -= 1
+            if self.open == 0 and self.started:
+                tracemalloc.stop()
+                self.started = False
+            return peak, self.entered != entry
+
+
+_tracing = _SharedTracing()
+
+
+class StageTimer:
+    """Records wall time, CPU time (this thread) and peak traced memory per named stage.
+    Disabled timers cost nothing, so call sites can wrap stages unconditionally.
+    Peak memory comes from tracemalloc, which is process-wide and slows allocation-heavy
+    code noticeably, so tracing only runs inside a stage and the timer should stay opt-in.
+    A stage that overlapped another traced stage (e.g. another job's) shares its peak, so
+    its figure is flagged with peak_shared.
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = True):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.stages: list[dict] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        if self.trace_memory:
+            baseline, entry, shared = _tracing.enter()
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            record = {
+                "stage": name,
+                "wall_s": round(time.perf_counter() - wall, 4),
+                "cpu_s": round(time.thread_time() - cpu, 4),
+            }
+            if self.trace_memory:
+                peak, entered_since = _tracing.exit(entry)
+                record["peak_mb"] = round((peak - baseline) / 1024 / 1024, 2)
+                record["peak_shared"] = shared or entered_since
+            self.stages.append(record)
+
+    def log(self, logger: logging.Logger, event: str, **fields) -> None:
+        # One structured JSON line per run, for log aggregators
+        logger.info(json.dumps({"event": event, **fields, "stages": self.stages}, default=str))
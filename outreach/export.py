@@ -0,0 +1,186 @@
+import io
+import time
+import zipfile
+from collections.abc import Iterable, Iterator
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from outreach.merge import OUTPUT_COLUMNS, arrow_strings
+
+SHEET_NAME = "Outreach"
+SENT_COLUMNS = ("Email Sent?", "Chaser sent?")
+WIDTH_SAMPLE_ROWS = 50
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+DATE_FORMAT = "yyyy-mm-dd hh:mm:ss"
+
+# Output format → (file extension, MIME type)
+OUTPUT_FORMATS = {
+    "xlsx": (".xlsx", XLSX_MIME),
+    "csv": (".csv", "text/csv"),
+    "zip": (".zip", "application/zip"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def sent_values(values: pd.Series) -> np.ndarray:
+    # A sent column as written: blank cells (every freshly merged row) default to "No",
+    # marks carried over from an existing tracker are kept
+    values = values.to_numpy(dtype=object)
+    return np.where(pd.isna(values) | (values == ""), "No", values).astype(object)
+
+
+def chunk_columns(chunk: pd.DataFrame) -> list:
+    # OUTPUT_COLUMNS, then any further columns the chunk carries (those kept from a tracker)
+    return [*OUTPUT_COLUMNS, *(col_name for col_name in chunk.columns if col_name not in OUTPUT_COLUMNS)]
+
+
+def first_columns(chunks: Iterable[pd.DataFrame]) -> tuple[list, Iterator[pd.DataFrame]]:
+    # The output's columns, from the first chunk (or just OUTPUT_COLUMNS), and all the chunks
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        return list(OUTPUT_COLUMNS), chunks
+    return chunk_columns(first), chain([first], chunks)
+
+
+def column_widths(sample: pd.DataFrame, columns: list = OUTPUT_COLUMNS) -> list[int]:
+    # Fit to header + first rows, clamped to 12..60 (sent dropdowns are a fixed 14)
+    widths = []
+    for col_name in columns:
+        if col_name in SENT_COLUMNS:
+            widths.append(14)
+            continue
+        values = sample[col_name].astype(str).head(WIDTH_SAMPLE_ROWS)
+        max_len = max([len(str(col_name))] + [len(x) for x in values])
+        widths.append(min(max(12, max_len + 2), 60))
+    return widths
+
+
+def _write_header(worksheet, first_chunk: pd.DataFrame, columns: list, header_format) -> int:
+    # Widths come from the first rows, so they are set before any data row is flushed
+    for col_idx, width in enumerate(column_widths(first_chunk, columns)):
+        worksheet.set_column(col_idx, col_idx, width)
+    worksheet.write_row(0, 0, columns, header_format)
+    return 1  # row 0 is headers
+
+
+def write_outreach_xlsx(target, chunks: Iterable[pd.DataFrame]) -> int:
+    """Writes merged chunks (OUTPUT_COLUMNS frames) to the Outreach sheet as they arrive.
+    xlsxwriter's constant_memory mode flushes every finished row to a temp file, so
+    neither a full output frame nor a full in-memory sheet is ever needed. Further columns
+    of the first chunk (kept from a tracker) are written after OUTPUT_COLUMNS.
+    Returns the number of data rows written.
+    """
+    import xlsxwriter
+
+    # Dates kept from a tracker are written as date cells
+    workbook = xlsxwriter.Workbook(target, {"constant_memory": True, "default_date_format": DATE_FORMAT})
+    worksheet = workbook.add_worksheet(SHEET_NAME)
+    header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+
+    row = 0
+    columns, chunks = first_columns(chunks)
+    for chunk in chunks:
+        if row == 0:
+            row = _write_header(worksheet, chunk, columns, header_format)
+
+        # "Email Sent?"/"Chaser sent?" default to "No" (so it behaves like an unchecked box)
+        values = [
+            sent_values(chunk[col_name]) if col_name in SENT_COLUMNS else chunk[col_name].to_numpy(dtype=object)
+            for col_name in columns
+        ]
+        for cells in zip(*values):
+            worksheet.write_row(row, 0, cells)
+            row += 1
+
+    if row == 0:
+        row = _write_header(worksheet, pd.DataFrame(columns=columns), columns, header_format)
+
+    # Excel-native "clickable" sent fields via dropdown validation (reliable)
+    last_row = row - 1  # inclusive last row index in xlsxwriter coordinates
+    for col_name in SENT_COLUMNS:
+        col_idx = OUTPUT_COLUMNS.index(col_name)
+        worksheet.data_validation(1, col_idx, max(1, last_row), col_idx, {
+            "validate": "list",
+            "source": ["No", "Yes"],
+        })
+
+    workbook.close()
+    return row - 1
+
+
+def _csv_rows(text, chunks: Iterable[pd.DataFrame]) -> int:
+    # Same columns and "No" defaults as the Outreach sheet; each chunk is written and dropped
+    columns, chunks = first_columns(chunks)
+    pd.DataFrame(columns=columns).to_csv(text, index=False)
+    rows = 0
+    for chunk in chunks:
+        chunk.assign(**{col_name: sent_values(chunk[col_name]) for col_name in SENT_COLUMNS})[columns].to_csv(
+            text, index=False, header=False
+        )
+        rows += len(chunk)
+    return rows
+
+
+def write_outreach_csv(target, chunks: Iterable[pd.DataFrame]) -> int:
+    """write_outreach_xlsx() as UTF-8 CSV: a path or a binary file object (left open).
+    Several times faster and smaller than xlsx for large lists, without the dropdowns.
+    """
+    if isinstance(target, (str, bytes)) or hasattr(target, "__fspath__"):
+        with open(target, "w", encoding="utf-8", newline="") as text:
+            return _csv_rows(text, chunks)
+    text = io.TextIOWrapper(target, encoding="utf-8", newline="")
+    try:
+        return _csv_rows(text, chunks)
+    finally:
+        text.flush()
+        text.detach()
+
+
+def write_outreach_zip(target, chunks: Iterable[pd.DataFrame], member: str = "outreach.csv") -> int:
+    # The CSV deflated into a single-member zip, streamed (zip64, so size is not limited)
+    info = zipfile.ZipInfo(member, date_time=time.localtime()[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(target, "w") as archive:
+        with archive.open(info, "w", force_zip64=True) as raw:
+            return write_outreach_csv(raw, chunks)
+
+
+def write_outreach_parquet(target, chunks: Iterable[pd.DataFrame]) -> int:
+    """write_outreach_xlsx() as a Parquet file of string columns (one row group per chunk).
+    Chunks already backed by Arrow (merge_parallel's rendered columns) are written without
+    a round trip through Python strings.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns, chunks = first_columns(chunks)
+    schema = pa.schema([(str(col_name), pa.large_string()) for col_name in columns])
+    rows = 0
+    with pq.ParquetWriter(target, schema) as writer:
+        for chunk in chunks:
+            size = len(chunk)
+            writer.write_table(pa.table(
+                [
+                    arrow_strings(sent_values(chunk[col_name]) if col_name in SENT_COLUMNS else chunk[col_name])
+                    for col_name in columns
+                ],
+                schema=schema,
+            ))
+            rows += size
+    return rows
+
+
+def write_outreach(target, chunks: Iterable[pd.DataFrame], fmt: str = "xlsx", member: str = "outreach.csv") -> int:
+    # Dispatch on an OUTPUT_FORMATS key; `member` names the CSV inside a zip
+    if fmt == "csv":
+        return write_outreach_csv(target, chunks)
+    if fmt == "zip":
+        return write_outreach_zip(target, chunks, member)
+    if fmt == "parquet":
+        return write_outreach_parquet(target, chunks)
+    if fmt == "xlsx":
+        return write_outreach_xlsx(target, chunks)
+    raise ValueError(f"Unknown output format: {fmt}")
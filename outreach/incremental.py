@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from outreach.merge import (
+    OUTPUT_COLUMNS,
+    RenderMemo,
+    clean_column,
+    column_bytes,
+    email_column_text,
+    render_at,
+)
+from outreach.pipeline import RENDERED_ROLES, MergePlan
+
+
+@dataclass
+class RowSnapshot:
+    """What the next merge_incremental() of the same list needs from this one: a hash of
+    each row's needed cells as text (row_hashes()), a hash of each email, the blank-filled placeholder
+    columns and the rendered columns. Kept as object arrays, so text carried over into
+    the next run is shared rather than copied. Only valid for the same templates,
+    mapping and blank_fill; key it on those.
+    """
+
+    hashes: np.ndarray
+    email_hashes: np.ndarray | None
+    cleaned: dict[str, np.ndarray]
+    columns: dict[str, np.ndarray]
+
+    @property
+    def nbytes(self) -> int:
+        # A ResultCache `sizeof` for snapshots (shared strings are counted once per row)
+        arrays = [*self.cleaned.values(), *self.columns.values()]
+        email_bytes = self.email_hashes.nbytes if self.email_hashes is not None else 0
+        return self.hashes.nbytes + email_bytes + sum(column_bytes(values) for values in arrays)
+
+
+@dataclass
+class RowChanges:
+    """How a list differs from the previous run. Rows are matched on email: a row whose
+    email was there before but whose values differ is changed, one with a new email is
+    added. Without an email column, every row with new values counts as added.
+    """
+
+    added: int
+    changed: int
+    removed: int
+    unchanged: int
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """One uint64 per row over the cells' str() text, missing cells as "" (what clean_column()
+    and email_column_text() render from), so equal hashes mean equal copy. Raw cells would not
+    do: pandas hashes 1, "1" and True alike, though True renders as "True".
+    """
+    if not len(df.columns):
+        return np.zeros(len(df), dtype=np.uint64)
+    text = pd.DataFrame({i: email_column_text(df[col]) for i, col in enumerate(df.columns)}, index=df.index)
+    return pd.util.hash_pandas_object(text, index=False).to_numpy()
+
+
+def match_rows(hashes: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    # Index of a previous row with the same hash for every row, or -1
+    if not len(previous):
+        return np.full(len(hashes), -1)
+    uniques, first = np.unique(previous, return_index=True)
+    found = np.searchsorted(uniques, hashes).clip(max=len(uniques) - 1)
+    return np.where(uniques[found] == hashes, first[found], -1)
+
+
+def merge_incremental(
+    plan: MergePlan, df: pd.DataFrame, blank_fill: str, previous: RowSnapshot | None = None
+) -> tuple[pd.DataFrame, RowSnapshot, RowChanges]:
+    """MergePlan.merge() against `previous`, the snapshot of the last run of this list
+    with the same templates. Rows whose needed cells hash the same as a previous row are
+    not cleaned again, and keep their rendered copy wherever they land on the same
+    template of the A → B → A… rotation; the rest is rendered, so the output equals a full
+    merge. Returns (output frame, snapshot for the next run, changes).
+    """
+    size = len(df)
+    hashes = row_hashes(df[plan.needed])
+    email = email_column_text(df[plan.email_col]) if plan.email_col else None
+    email_hashes = pd.util.hash_array(email) if email is not None else None
+
+    prior = match_rows(hashes, previous.hashes) if previous is not None else np.full(size, -1)
+    matched = prior >= 0
+    fresh = np.flatnonzero(~matched)
+    roles = {name: getattr(plan, role) for name, role in RENDERED_ROLES.items() if getattr(plan, role)}
+
+    # Blank filling is most of a merge's cost, so only new or edited rows are cleaned
+    cleaned = {}
+    for col in dict.fromkeys(col for compiled in roles.values() for t in compiled for col in t.columns if col):
+        values = np.empty(size, dtype=object)
+        if matched.any():
+            values[matched] = previous.cleaned[col][prior[matched]]
+        values[fresh] = clean_column(df[col].iloc[fresh], blank_fill)
+        cleaned[col] = values
+
+    memo = RenderMemo()
+    positions = np.arange(size)
+    columns = {name: np.full(size, "", dtype=object) for name in OUTPUT_COLUMNS}
+    if email is not None:
+        columns["Email address"] = email
+    for name, compiled in roles.items():
+        n = len(compiled)
+        # Same values on the same template (previous row index ≡ this row index mod n) → same text
+        kept = matched & (prior % n == positions % n)
+        out = np.empty(size, dtype=object)
+        if kept.any():
+            out[kept] = previous.columns[name][prior[kept]]
+        rows = np.flatnonzero(~kept)
+        out[rows] = render_at(compiled, {col: values[rows] for col, values in cleaned.items()}, rows, memo)
+        columns[name] = out
+
+    snapshot = RowSnapshot(hashes, email_hashes, cleaned, {name: columns[name] for name in roles})
+    unchanged = int(matched.sum())
+    if previous is None:
+        changes = RowChanges(added=size, changed=0, removed=0, unchanged=0)
+    elif email_hashes is not None and previous.email_hashes is not None:
+        # A new row without an email cannot be matched to an old one, so it is added, not changed
+        changed = int((np.isin(email_hashes[fresh], previous.email_hashes) & (email[fresh] != "")).sum())
+        changes = RowChanges(
+            added=len(fresh) - changed,
+            changed=changed,
+            removed=int((~np.isin(previous.email_hashes, email_hashes)).sum()),
+            unchanged=unchanged,
+        )
+    else:
+        changes = RowChanges(
+            added=len(fresh),
+            changed=0,
+            removed=int((~np.isin(previous.hashes, hashes)).sum()),
+            unchanged=unchanged,
+        )
+    return pd.DataFrame(columns, columns=OUTPUT_COLUMNS), snapshot, changes
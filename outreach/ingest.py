@@ -0,0 +1,362 @@
+import datetime
+import importlib.util
+from collections.abc import Iterator
+
+import pandas as pd
+
+# pandas' default na_values: read_excel turns these cell strings into NaN
+NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+# "auto" prefers the Rust-backed calamine reader (python-calamine) when it is installed
+EXCEL_ENGINES = ("auto", "calamine", "openpyxl")
+
+
+def excel_engine(engine: str = "auto") -> str:
+    # The engine ExcelStream will use: "openpyxl" unless calamine is wanted and importable
+    if engine == "openpyxl" or importlib.util.find_spec("python_calamine") is None:
+        return "openpyxl"
+    return "calamine"
+
+
+def excel_cell(val, na_strings: bool = True):
+    # Same cell values pd.read_excel(dtype=object) would produce (whichever engine read them);
+    # na_strings=False keeps "N/A", "None", "" etc. as text (keep_default_na=False)
+    if val is None:
+        return None
+    if isinstance(val, float) and val.is_integer():
+        return int(val)
+    if na_strings and isinstance(val, str) and val in NA_STRINGS:
+        return None
+    if type(val) is datetime.date:  # calamine: date-only cells; openpyxl gives datetimes
+        return datetime.datetime(val.year, val.month, val.day)
+    return val
+
+
+def header_names(values: tuple) -> list:
+    # pandas-style column labels: blanks become "Unnamed: i", duplicates get ".1", ".2"…
+    names: list = []
+    seen: set = set()
+    for i, val in enumerate(values):
+        if val is None or val == "":
+            name = f"Unnamed: {i}"
+        elif isinstance(val, float) and val.is_integer():
+            name = int(val)
+        else:
+            name = val
+        base, n = name, 0
+        while name in seen:
+            n += 1
+            name = f"{base}.{n}"
+        names.append(name)
+        seen.add(name)
+    return names
+
+
+class LeadStream:
+    # Shared by the readers: `columns` (pandas naming) is known on open, iteration yields chunks
+    columns: list
+    selected: list
+    estimated_rows: int | None = None
+    engine = ""  # the library doing the parsing, for diagnostics
+
+    def select_columns(self, columns: list) -> None:
+        wanted = set(columns)
+        self.selected = [col for col in self.columns if col in wanted]
+
+    def header_frame(self) -> pd.DataFrame:
+        # Empty frame with the input's columns, for build_header_map/find_email_column
+        return pd.DataFrame(columns=self.columns)
+
+    def close(self) -> None:
+        pass
+
+
+class ExcelStream(LeadStream):
+    """Streams one sheet (the first by default) of an .xlsx with openpyxl read_only mode.
+    The header row is read on open (so mappings can be validated before any data is parsed);
+    iterating yields object-dtype DataFrame chunks of at most `chunk_rows` rows, so peak
+    memory is bounded by the chunk size rather than the workbook. select_columns() limits
+    the chunks to the columns the templates need.
+
+    engine="calamine" (or "auto" with python-calamine installed) parses the sheet with the
+    Rust-backed calamine reader instead: several times faster, but the whole sheet is held
+    in memory. If calamine is missing or cannot open the file, openpyxl is used; `engine`
+    records which one did.
+
+    na_strings=False keeps text cells such as "N/A" or "None" as they are instead of
+    reading them as missing (pandas' keep_default_na=False); only empty cells are None.
+    """
+
+    def __init__(
+        self,
+        source,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        sheet: int | str = 0,
+        engine: str = "auto",
+        na_strings: bool = True,
+    ):
+        self.chunk_rows = chunk_rows
+        self.na_strings = na_strings
+        self.engine = excel_engine(engine)
+        if self.engine == "calamine":
+            try:
+                self._open_calamine(source, sheet)
+            except Exception:
+                if hasattr(source, "seek"):
+                    source.seek(0)
+                self.engine = "openpyxl"
+        if self.engine == "openpyxl":
+            self._open_openpyxl(source, sheet)
+        self.columns = header_names(next(self._rows, ()))
+        self.selected = list(self.columns)
+
+    def _open_openpyxl(self, source, sheet: int | str) -> None:
+        from openpyxl import load_workbook
+
+        self._book = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+        sheet = self._book.worksheets[sheet] if isinstance(sheet, int) else self._book[sheet]
+        # Data rows per the sheet's stored dimension, for progress only: writers may omit or misstate it
+        self.estimated_rows = max(0, sheet.max_row - 1) if sheet.max_row else None
+        sheet.reset_dimensions()
+        self._rows = sheet.iter_rows(values_only=True)
+
+    def _open_calamine(self, source, sheet: int | str) -> None:
+        from python_calamine import CalamineWorkbook
+
+        self._book = CalamineWorkbook.from_object(source)
+        sheet = self._book.get_sheet_by_index(sheet) if isinstance(sheet, int) else self._book.get_sheet_by_name(sheet)
+        self.estimated_rows = sheet.end[0] if sheet.end else None
+        # Rows start at row 1 but columns at the first used one; pad so positions match openpyxl
+        lead = [None] * (sheet.start[1] if sheet.start else 0)
+        self._rows = (lead + row for row in sheet.iter_rows()) if lead else iter(sheet.iter_rows())
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        width = len(self.columns)
+        positions = [self.columns.index(col) for col in self.selected]
+        chunk: list[list] = []
+        pending_blank = 0  # blank rows are only kept if data follows (pandas trims trailing ones)
+        try:
+            for values in self._rows:
+                values = values[:width]
+                if all(v is None or v == "" for v in values):
+                    pending_blank += 1
+                    continue
+                row = [excel_cell(values[p], self.na_strings) if p < len(values) else None for p in positions]
+                for _ in range(pending_blank):
+                    chunk.append([None] * len(positions))
+                    if len(chunk) >= self.chunk_rows:
+                        yield self._frame(chunk)
+                        chunk = []
+                pending_blank = 0
+                chunk.append(row)
+                if len(chunk) >= self.chunk_rows:
+                    yield self._frame(chunk)
+                    chunk = []
+            if chunk:
+                yield self._frame(chunk)
+        finally:
+            self.close()
+
+    def _frame(self, rows: list[list]) -> pd.DataFrame:
+        return pd.DataFrame(rows, columns=self.selected, dtype=object)
+
+    def close(self) -> None:
+        self._book.close()
+
+
+def is_gzip(source) -> bool:
+    # By content rather than file name, so renamed or extension-less uploads still work
+    if hasattr(source, "read"):
+        position = source.tell()
+        magic = source.read(2)
+        source.seek(position)
+    else:
+        with open(source, "rb") as fh:
+            magic = fh.read(2)
+    return magic == b"\x1f\x8b"
+
+
+class CsvStream(LeadStream):
+    """Streams a .csv (plain or gzip-compressed) with pd.read_csv(chunksize=...), with the
+    same interface as ExcelStream. Cells stay text exactly as written (dtype=object), with
+    pandas' default NA strings as missing unless na_strings=False (then empty cells are "");
+    unselected columns are skipped by the parser.
+    """
+
+    def __init__(self, source, chunk_rows: int = DEFAULT_CHUNK_ROWS, na_strings: bool = True):
+        self.chunk_rows = chunk_rows
+        self.na_strings = na_strings
+        self.engine = "pandas"
+        self._source = source
+        self.compression = "gzip" if is_gzip(source) else None
+        self.columns = list(self._read(nrows=0).columns)
+        self.selected = list(self.columns)
+
+    def _read(self, **kwargs):
+        if hasattr(self._source, "seek"):
+            self._source.seek(0)
+        return pd.read_csv(
+            self._source, dtype=object, compression=self.compression, keep_default_na=self.na_strings, **kwargs
+        )
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        # By position: duplicate headers only have their mangled names after parsing
+        positions = [self.columns.index(col) for col in self.selected]
+        with self._read(usecols=positions or None, chunksize=self.chunk_rows) as reader:
+            for chunk in reader:
+                yield chunk if positions else chunk[[]]
+
+
+def parquet_cell_text(values):
+    """A pyarrow column as large_string text, rendered as the Excel/CSV readers' cells would
+    be: strings and numbers are cast in Arrow (integral numbers without ".0"), while dates,
+    times and booleans go through str() of their pandas values ("2024-01-02 03:04:00",
+    "True") rather than Arrow's own formatting. Nulls stay null.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if pa.types.is_temporal(values.type) or pa.types.is_boolean(values.type):
+        cells = values.to_pandas().astype(object)
+        return pa.array(cells.map(str).mask(cells.isna(), None), type=pa.large_string(), from_pandas=True)
+    return pc.cast(values, pa.large_string())
+
+
+class ParquetStream(LeadStream):
+    """Streams a Parquet file in record batches with pyarrow, with the same interface as
+    ExcelStream. Only the selected columns are read from disk, and cells are turned into
+    text with parquet_cell_text() and handed over as string[pyarrow] columns, so text stays in
+    Arrow buffers rather than Python objects. Columns that cannot be cast to text (lists,
+    structs) fall back to Python objects.
+    """
+
+    def __init__(self, source, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        import pyarrow.parquet as pq
+
+        self.chunk_rows = chunk_rows
+        self.engine = "pyarrow"
+        self._file = pq.ParquetFile(source)
+        self.columns = list(self._file.schema_arrow.names)
+        self.selected = list(self.columns)
+        self.estimated_rows = self._file.metadata.num_rows
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        import pyarrow as pa
+
+        try:
+            for batch in self._file.iter_batches(batch_size=self.chunk_rows, columns=self.selected):
+                data = {}
+                for name, values in zip(self.selected, batch.columns):
+                    try:
+                        data[name] = pd.Series(parquet_cell_text(values), dtype=pd.ArrowDtype(pa.large_string()))
+                    except pa.ArrowNotImplementedError:
+                        data[name] = pd.Series(values.to_pylist(), dtype=object)
+                yield pd.DataFrame(data, index=range(batch.num_rows), columns=self.selected)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+INPUT_FORMATS = {".xlsx": "xlsx", ".csv": "csv", ".csv.gz": "csv", ".parquet": "parquet"}
+
+
+def input_format(name: str) -> str:
+    lower = str(name).lower()
+    for suffix, fmt in INPUT_FORMATS.items():
+        if lower.endswith(suffix):
+            return fmt
+    raise ValueError(f"Unsupported file type: {name} (expected .xlsx, .csv, .csv.gz or .parquet)")
+
+
+def open_stream(
+    source,
+    fmt: str = "xlsx",
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    sheet: int | str = 0,
+    engine: str = "auto",
+    na_strings: bool = True,
+) -> LeadStream:
+    # `engine` only applies to .xlsx (see ExcelStream); Parquet never reads text as missing
+    if fmt == "csv":
+        return CsvStream(source, chunk_rows, na_strings)
+    if fmt == "parquet":
+        return ParquetStream(source, chunk_rows)
+    return ExcelStream(source, chunk_rows, sheet, engine, na_strings)
+
+
+def excel_sheet_names(source) -> list[str]:
+    from openpyxl import load_workbook
+
+    book = load_workbook(source, read_only=True, keep_links=False)
+    try:
+        return list(book.sheetnames)
+    finally:
+        book.close()
+
+
+def excel_sheets_with_data(source) -> list[str]:
+    # Names of the worksheets holding at least one non-blank cell; each is read up to its first
+    from openpyxl import load_workbook
+
+    book = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    try:
+        return [
+            sheet.title
+            for sheet in book.worksheets
+            if any(val is not None and val != "" for row in sheet.iter_rows(values_only=True) for val in row)
+        ]
+    finally:
+        book.close()
+
+
+def read_header(source, fmt: str = "xlsx", sheet: int | str = 0, engine: str = "auto") -> list:
+    # Column labels only (pandas naming); no data rows are parsed
+    stream = open_stream(source, fmt, sheet=sheet, engine=engine)
+    stream.close()
+    return stream.columns
+
+
+def read_columns(source, columns: list, fmt: str = "xlsx", sheet: int | str = 0, engine: str = "auto") -> pd.DataFrame:
+    """pd.read_excel/read_csv(dtype=object) or pd.read_parquet restricted to `columns`.
+    pandas' usecols still converts every cell of every row of a sheet before selecting,
+    so this reads rows through the stream and only converts/keeps the selected cells.
+    """
+    stream = open_stream(source, fmt, sheet=sheet, engine=engine)
+    stream.select_columns(columns)
+    chunks = list(stream)
+    frame = pd.concat(chunks, ignore_index=True) if chunks else stream.header_frame()[stream.selected]
+    frame.attrs["engine"] = stream.engine
+    return frame
+
+
+def read_head(
+    source, columns: list, rows: int, fmt: str = "xlsx", sheet: int | str = 0, engine: str = "auto"
+) -> pd.DataFrame:
+    # First `rows` data rows of `columns` only; the rest of the file is never parsed
+    stream = open_stream(source, fmt, chunk_rows=rows, sheet=sheet, engine=engine)
+    stream.select_columns(columns)
+    chunks = iter(stream)
+    head = next(chunks, None)
+    chunks.close()
+    if head is None:
+        return stream.header_frame()[stream.selected]
+    return head
+
+
+def read_excel_header(source, sheet: int | str = 0, engine: str = "auto") -> list:
+    return read_header(source, "xlsx", sheet, engine)
+
+
+def read_excel_columns(source, columns: list, sheet: int | str = 0, engine: str = "auto") -> pd.DataFrame:
+    return read_columns(source, columns, "xlsx", sheet, engine)
+
+
+def read_excel_head(source, columns: list, rows: int, sheet: int | str = 0, engine: str = "auto") -> pd.DataFrame:
+    return read_head(source, columns, rows, "xlsx", sheet, engine)
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+
+import pandas as pd
+
+from outreach.scheduler import AdmissionScheduler
+
+# In-memory lists are merged in slices of this many rows so progress (and cancel) stays responsive
+PROGRESS_CHUNK_ROWS = 10_000
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class GenerationJob:
+    """A generation running on a daemon thread, so the UI can poll it across reruns.
+    The target receives the job and reports rows as they are produced via advance();
+    advance() raises JobCancelled once cancel() was requested, unwinding the target.
+    The target may also set `status` (what it is doing now) and `total_rows` once known;
+    `meta` carries whatever the caller needs to render the finished job.
+    With a `scheduler`, the job queues (state "queued") until admitted with `estimated_bytes`.
+    """
+
+    def __init__(
+        self,
+        target: Callable[["GenerationJob"], object],
+        total_rows: int | None = None,
+        meta: dict | None = None,
+        scheduler: AdmissionScheduler | None = None,
+        estimated_bytes: int = 0,
+    ):
+        self.total_rows = total_rows
+        self.rows_done = 0
+        self.status = ""
+        self.state = "pending"  # pending → (queued →) running → done | failed | cancelled
+        self.result = None
+        self.error: Exception | None = None
+        self.meta = meta or {}
+        self.estimated_bytes = estimated_bytes
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.scheduler = scheduler
+        self.ticket = None
+        self._target = target
+        self._cancel = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="outreach-generate", daemon=True)
+
+    def start(self) -> "GenerationJob":
+        self.started_at = time.time()
+        if self.scheduler is not None:
+            self.state = "queued"
+            self.ticket = self.scheduler.enqueue(self.estimated_bytes)
+        else:
+            self.state = "running"
+        self.thread.start()
+        return self
+
+    def _run(self) -> None:
+        try:
+            if self.ticket is not None:
+                if not self.scheduler.wait(self.ticket, self._cancel):
+                    raise JobCancelled()
+                self.state = "running"
+            try:
+                self.result = self._target(self)
+            finally:
+                if self.ticket is not None:
+                    self.scheduler.release(self.ticket)
+            self.state = "done"
+        except JobCancelled:
+            self.state = "cancelled"
+        except Exception as e:
+            self.error = e
+            self.state = "failed"
+        finally:
+            self.finished_at = time.time()
+
+    def advance(self, rows: int) -> None:
+        self.check_cancelled()
+        self.rows_done += rows
+
+    def check_cancelled(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        self.thread.join(timeout)
+        return self.finished
+
+    @property
+    def queue_position(self) -> int:
+        # 1-based while queued, else 0
+        return self.scheduler.position(self.ticket) if self.ticket is not None else 0
+
+    @property
+    def cancelling(self) -> bool:
+        return self._cancel.is_set() and not self.finished
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "failed", "cancelled")
+
+    @property
+    def progress(self) -> float | None:
+        if not self.total_rows:
+            return None
+        return min(1.0, self.rows_done / self.total_rows)
+
+
+def track_rows(chunks: Iterable[pd.DataFrame], job: GenerationJob) -> Iterator[pd.DataFrame]:
+    # Reports each chunk's rows to the job (and stops there if it was cancelled)
+    for chunk in chunks:
+        job.advance(len(chunk))
+        yield chunk
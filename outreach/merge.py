@@ -0,0 +1,526 @@
+import importlib.util
+import re
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([^\}]+?)\s*\}\}")
+
+# Render distinct value combinations only while they are at most this share of the rows
+DISTINCT_RENDER_RATIO = 0.5
+
+# RenderMemo budget in characters of rendered text and key values, so a streamed merge's memo
+# stays bounded however long the copy is
+RENDER_MEMO_CHARS = 16 * 1024 * 1024
+
+# compact_arrow_column() judges Arrow columns by this many leading rows before counting them all
+COMPACT_SAMPLE_ROWS = 65_536
+
+
+def norm_key(s: str) -> str:
+    # case-insensitive, ignore spaces + underscores
+    return re.sub(r"[ _]+", "", str(s).strip().lower())
+
+
+def extract_placeholders(template: str) -> list[str]:
+    return PLACEHOLDER_RE.findall(template)
+
+
+def build_header_map(df: pd.DataFrame) -> dict[str, str]:
+    # {normalized_header: original_header} (first wins)
+    m: dict[str, str] = {}
+    for col in df.columns:
+        k = norm_key(col)
+        if k not in m:
+            m[k] = col
+    return m
+
+
+def validate_mappings(all_templates: list[str], header_map: dict[str, str]):
+    # Validate placeholders across ALL templates passed in
+    all_placeholders: list[str] = []
+    for t in all_templates:
+        all_placeholders.extend(extract_placeholders(t))
+
+    missing: list[str] = []
+    mapping: dict[str, str] = {}
+    for ph in all_placeholders:
+        key = norm_key(ph)
+        if key in header_map:
+            mapping[ph] = header_map[key]
+        else:
+            missing.append(ph)
+
+    # de-dupe missing while preserving order
+    seen = set()
+    missing_unique: list[str] = []
+    for m in missing:
+        if m not in seen:
+            missing_unique.append(m)
+            seen.add(m)
+
+    return mapping, missing_unique
+
+
+def cell_text(val, blank_fill: str) -> str:
+    if pd.isna(val) or str(val).strip() == "":
+        return blank_fill
+    return str(val)
+
+
+class RenderMemo:
+    """Bounded LRU of rendered text keyed on (template, referenced values after blank filling).
+    Repeated keys return the very same str object, so a template that only references
+    low-cardinality columns ({{company}}, {{niche}}) costs one string per distinct value
+    combination instead of one per row. Bounded by `max_chars` of text held (rendered copy
+    plus the key's values), not entries, since one email body can run to kilobytes.
+    Not thread-safe: use one per merge.
+    """
+
+    def __init__(self, max_chars: int = RENDER_MEMO_CHARS):
+        self.max_chars = max_chars
+        self.chars = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+
+    @staticmethod
+    def _chars(key: tuple, text: str) -> int:
+        return len(text) + sum(len(value) for value in key[1])
+
+    def get(self, key: tuple) -> str | None:
+        text = self._entries.get(key)
+        if text is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return text
+
+    def put(self, key: tuple, text: str) -> str:
+        if key in self._entries:
+            self.chars -= self._chars(key, self._entries.pop(key))
+        self._entries[key] = text
+        self.chars += self._chars(key, text)
+        while self.chars > self.max_chars and self._entries:
+            self.chars -= self._chars(*self._entries.popitem(last=False))
+        return text
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def value_codes(cleaned: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    # Integer code per distinct value of each column, so combinations are compared as ints
+    return {col: pd.factorize(values)[0] for col, values in cleaned.items()}
+
+
+def value_combinations(codes: list[np.ndarray], limit: int | None = None) -> tuple[np.ndarray, np.ndarray] | None:
+    """Numbers each row's combination of values, given each column's value_codes().
+    Returns (combination, first): combination[i] is row i's and first[j] the first row
+    with combination j. None as soon as there are more than `limit` combinations.
+    """
+    combination = None
+    for column_codes in codes:
+        if combination is not None:
+            column_codes = combination * (int(column_codes.max(initial=0)) + 1) + column_codes
+        combination = pd.factorize(column_codes)[0]  # renumbered densely, so it cannot overflow
+        if limit is not None and combination.max(initial=-1) >= limit:
+            return None
+    _, first = np.unique(combination, return_index=True)
+    return combination, first
+
+
+class CompiledTemplate:
+    """A template split once into literal segments and placeholder slots.
+    Slots are resolved to column names up front (None when a placeholder is unmapped),
+    so rendering a row is a single join instead of a regex pass.
+    """
+
+    def __init__(self, template: str, mapping: dict[str, str]):
+        self.template = template
+        self.literals: list[str] = []
+        self.columns: list[str | None] = []
+
+        pos = 0
+        for match in PLACEHOLDER_RE.finditer(template):
+            self.literals.append(template[pos:match.start()])
+            self.columns.append(mapping.get(match.group(1)) or None)
+            pos = match.end()
+        self.literals.append(template[pos:])
+
+    def render(self, row, blank_fill: str) -> str:
+        parts = [self.literals[0]]
+        for col, literal in zip(self.columns, self.literals[1:]):
+            parts.append(cell_text(row.get(col, ""), blank_fill) if col else "")
+            parts.append(literal)
+        return "".join(parts)
+
+    def positions(self, index: dict[str, int]) -> list[int | None]:
+        # Slot -> position in a row tuple laid out by `index` ({column: position})
+        return [index.get(col) if col else None for col in self.columns]
+
+    def render_values(
+        self, values: tuple, positions: list[int | None], blank_fill: str, memo: RenderMemo | None = None
+    ) -> str:
+        # Same output as render(), for a plain tuple row (see ColumnarRows)
+        texts = tuple(cell_text(values[pos], blank_fill) if pos is not None else "" for pos in positions)
+        if memo is not None:
+            text = memo.get((self, texts))
+            if text is not None:
+                return text
+        parts = [self.literals[0]]
+        for text, literal in zip(texts, self.literals[1:]):
+            parts.append(text)
+            parts.append(literal)
+        text = "".join(parts)
+        return memo.put((self, texts), text) if memo is not None else text
+
+    def render_columns(
+        self,
+        cleaned: dict[str, np.ndarray],
+        size: int,
+        memo: RenderMemo | None = None,
+        codes: dict[str, np.ndarray] | None = None,
+    ) -> np.ndarray:
+        """cleaned: {column: already blank-filled text}, all of length `size`.
+        When the referenced columns hold few distinct value combinations, only those are
+        rendered (or taken from `memo`) and rows share the resulting string objects.
+        `codes` (value_codes() of `cleaned`) can be passed in when shared across templates.
+        """
+        slots = list(dict.fromkeys(col for col in self.columns if col))
+        if slots and size:
+            if codes is None:
+                codes = value_codes({col: cleaned[col] for col in slots})
+            combinations = value_combinations([codes[col] for col in slots], int(size * DISTINCT_RENDER_RATIO))
+            if combinations is not None:
+                combination, first = combinations
+                distinct = {col: cleaned[col][first] for col in slots}
+                if memo is None:
+                    return self._concat(distinct, len(first))[combination]
+                return self._memo_render(distinct, len(first), slots, memo)[combination]
+        return self._concat(cleaned, size)
+
+    def _memo_render(self, distinct: dict[str, np.ndarray], size: int, slots: list[str], memo: RenderMemo) -> np.ndarray:
+        # Distinct combinations seen in earlier chunks come from the memo; the rest are rendered
+        keys = [(self, values) for values in zip(*(distinct[col] for col in slots))]
+        texts = [memo.get(key) for key in keys]
+        missing = [i for i, text in enumerate(texts) if text is None]
+        if missing:
+            rendered = self._concat({col: distinct[col][missing] for col in slots}, len(missing))
+            for i, text in zip(missing, rendered):
+                texts[i] = memo.put(keys[i], text)
+        out = np.empty(size, dtype=object)
+        out[:] = texts
+        return out
+
+    def _concat(self, cleaned: dict[str, np.ndarray], size: int) -> np.ndarray:
+        out = np.full(size, self.literals[0], dtype=object)
+        for col, literal in zip(self.columns, self.literals[1:]):
+            if col:
+                out = out + cleaned[col]
+            if literal:
+                out = out + literal
+        return out
+
+
+def merge_row(template: str, row: pd.Series, mapping: dict[str, str], blank_fill: str) -> str:
+    return CompiledTemplate(template, mapping).render(row, blank_fill)
+
+
+class ColumnarRows:
+    """Only the needed DataFrame columns, pulled out once as object arrays.
+    Iterating yields plain tuples laid out by `index`, so the row loop never builds a
+    pandas Series per row or does label lookups.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: list[str | None]):
+        self.columns = list(dict.fromkeys(col for col in columns if col))
+        self.index = {col: i for i, col in enumerate(self.columns)}
+        self.arrays = [df[col].to_numpy(dtype=object) for col in self.columns]
+        self.size = len(df)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        if not self.arrays:
+            return iter([()] * self.size)
+        return zip(*self.arrays)
+
+
+def clean_column(values: pd.Series, blank_fill: str) -> np.ndarray:
+    # cell_text() for a whole column at once
+    text = values.astype(str)
+    blank = values.isna() | text.str.strip().eq("")
+    return text.mask(blank, blank_fill).to_numpy(dtype=object)
+
+
+def email_column_text(values: pd.Series) -> np.ndarray:
+    return values.astype(str).mask(values.isna(), "").to_numpy(dtype=object)
+
+
+def arrow_strings(values):
+    # A column as Arrow large_string text: its cells' str() (what clean_column() and
+    # email_column_text() see, e.g. dates and numbers kept typed from a tracker), NA as null
+    import pyarrow as pa
+
+    try:
+        return pa.array(values, type=pa.large_string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        values = pd.Series(values, dtype=object)
+        return pa.array(values.astype(str).mask(values.isna(), None), type=pa.large_string(), from_pandas=True)
+
+
+def render_rotated(
+    compiled: list[CompiledTemplate],
+    cleaned: dict[str, np.ndarray],
+    size: int,
+    start: int = 0,
+    memo: RenderMemo | None = None,
+    codes: dict[str, np.ndarray] | None = None,
+) -> np.ndarray:
+    # Row i uses compiled[i % n]: render each template over its own slice only, then scatter back.
+    # `start` is the global index of the first row, so chunks keep the rotation of the whole list.
+    if not compiled:
+        return np.full(size, "", dtype=object)
+    if codes is None:
+        codes = value_codes(cleaned)
+
+    out = np.empty(size, dtype=object)
+    n = len(compiled)
+    for k, template in enumerate(compiled):
+        first = (k - start) % n
+        rows = slice(first, None, n)
+        part = {col: cleaned[col][rows] for col in template.columns if col}
+        part_codes = {col: codes[col][rows] for col in part}
+        out[rows] = template.render_columns(part, len(range(first, size, n)), memo, part_codes)
+    return out
+
+
+def render_at(
+    compiled: list[CompiledTemplate],
+    cleaned: dict[str, np.ndarray],
+    rows: np.ndarray,
+    memo: RenderMemo | None = None,
+) -> np.ndarray:
+    # render_rotated() for just the rows at `rows` (global row indexes); cleaned[col][i] is row rows[i]
+    out = np.full(len(rows), "", dtype=object)
+    n = len(compiled)
+    for k, template in enumerate(compiled):
+        picked = np.flatnonzero(rows % n == k)
+        if len(picked):
+            part = {col: cleaned[col][picked] for col in template.columns if col}
+            out[picked] = template.render_columns(part, len(picked), memo)
+    return out
+
+
+def render_frame(template: CompiledTemplate, df: pd.DataFrame, blank_fill: str) -> np.ndarray:
+    # One template over every row of `df` (no rotation), e.g. to preview a single variant
+    cleaned = {col: clean_column(df[col], blank_fill) for col in template.columns if col}
+    return template.render_columns(cleaned, len(df))
+
+
+OUTPUT_COLUMNS = [
+    "Email address",
+    "Subject line",
+    "Email Copy",
+    "Email Sent?",
+    "Chaser copy",
+    "Chaser sent?",
+    "Status",
+]
+
+
+def merge_columns(
+    df: pd.DataFrame,
+    subject_compiled: list[CompiledTemplate],
+    email_compiled: list[CompiledTemplate],
+    chaser_compiled: list[CompiledTemplate],
+    email_col: str | None,
+    blank_fill: str,
+    start: int = 0,
+    memo: RenderMemo | None = None,
+) -> dict[str, np.ndarray]:
+    """Column-vectorized merge: every placeholder column is cleaned once, then each
+    template is concatenated column-wise over the rows it is rotated onto.
+    Row order and A → B → A… rotation match merge_frame_rows(); `start` offsets the
+    rotation when `df` is a chunk of a larger list; `memo` carries rendered text across
+    chunks. Returns {output column: values}.
+    """
+    size = len(df)
+    used = [c for t in subject_compiled + email_compiled + chaser_compiled for c in t.columns if c]
+    cleaned = {col: clean_column(df[col], blank_fill) for col in dict.fromkeys(used)}
+    codes = value_codes(cleaned)
+    empty = np.full(size, "", dtype=object)
+
+    return {
+        "Email address": email_column_text(df[email_col]) if email_col else empty,
+        "Subject line": render_rotated(subject_compiled, cleaned, size, start, memo, codes),
+        "Email Copy": render_rotated(email_compiled, cleaned, size, start, memo, codes),
+        "Email Sent?": empty,  # will become a dropdown in Excel
+        "Chaser copy": render_rotated(chaser_compiled, cleaned, size, start, memo, codes),
+        "Chaser sent?": empty,  # will become a dropdown in Excel
+        "Status": empty,
+    }
+
+
+def compact_column(values, distinct_ratio: float = DISTINCT_RENDER_RATIO):
+    """A text column in less memory than one Python str per row. A Categorical when at most
+    `distinct_ratio` of the rows are distinct (a constant default column costs one byte per
+    row), else string[pyarrow] (one contiguous buffer) when pyarrow is installed.
+    """
+    if isinstance(values, pd.Categorical) or isinstance(values.dtype, pd.StringDtype):
+        return values
+    if isinstance(values.dtype, pd.ArrowDtype) and values.dtype.kind == "U":
+        return compact_arrow_column(values.__arrow_array__(), distinct_ratio)
+    codes, uniques = pd.factorize(values)
+    if len(uniques) <= max(1, len(values) * distinct_ratio):
+        return pd.Categorical.from_codes(codes, uniques, validate=False)
+    if importlib.util.find_spec("pyarrow") is None:
+        return values
+    return pd.array(values, dtype="string[pyarrow]")
+
+
+def compact_arrow_column(values, distinct_ratio: float = DISTINCT_RENDER_RATIO):
+    """compact_column() of an Arrow string ChunkedArray (merge_parallel's columns) without
+    leaving Arrow: distinct values are counted and encoded there, and a distinct column keeps
+    its buffers as string[pyarrow]. Columns already distinct over their first
+    COMPACT_SAMPLE_ROWS rows are taken as distinct without hashing the rest.
+    """
+    import pyarrow.compute as pc
+
+    sample = values.slice(0, COMPACT_SAMPLE_ROWS)
+    if pc.count_distinct(sample).as_py() > max(1, len(sample) * distinct_ratio):
+        return pd.arrays.ArrowStringArray(values)
+    if len(values) == len(sample) or pc.count_distinct(values).as_py() <= max(1, len(values) * distinct_ratio):
+        encoded = pc.dictionary_encode(values).combine_chunks()
+        return pd.Categorical.from_codes(
+            encoded.indices.fill_null(-1).to_numpy(), encoded.dictionary.to_numpy(zero_copy_only=False), validate=False
+        )
+    return pd.arrays.ArrowStringArray(values)
+
+
+def column_bytes(values) -> int:
+    # Memory held by a column, text included (a ResultCache `sizeof` for rendered columns)
+    return int(pd.Series(values, copy=False).memory_usage(index=False, deep=True))
+
+
+def compact_frame(columns: dict) -> pd.DataFrame:
+    # merge_columns() output as an OUTPUT_COLUMNS frame of compact_column()s, for frames that are held.
+    # No columns= here: with it, pandas converts every extension array to an object ndarray first
+    return pd.DataFrame({name: compact_column(columns[name]) for name in OUTPUT_COLUMNS}, copy=False)
+
+
+def merge_frame(
+    df: pd.DataFrame,
+    subject_compiled: list[CompiledTemplate],
+    email_compiled: list[CompiledTemplate],
+    chaser_compiled: list[CompiledTemplate],
+    email_col: str | None,
+    blank_fill: str,
+    start: int = 0,
+    memo: RenderMemo | None = None,
+    compact: bool = False,
+) -> pd.DataFrame:
+    # merge_columns() as an OUTPUT_COLUMNS frame; compact=True when the whole output is kept around
+    columns = merge_columns(df, subject_compiled, email_compiled, chaser_compiled, email_col, blank_fill, start, memo)
+    if compact:
+        return compact_frame(columns)
+    return pd.DataFrame(columns, columns=OUTPUT_COLUMNS)
+
+
+def merge_chunks(
+    chunks: Iterable[pd.DataFrame],
+    subject_compiled: list[CompiledTemplate],
+    email_compiled: list[CompiledTemplate],
+    chaser_compiled: list[CompiledTemplate],
+    email_col: str | None,
+    blank_fill: str,
+    start: int = 0,
+) -> Iterator[pd.DataFrame]:
+    # merge_frame() over a stream of input chunks, rotating on the global row index (from
+    # `start`); one RenderMemo spans the stream, so combinations repeated across chunks render once
+    memo = RenderMemo()
+    for chunk in chunks:
+        yield merge_frame(chunk, subject_compiled, email_compiled, chaser_compiled, email_col, blank_fill, start, memo)
+        start += len(chunk)
+
+
+def frame_chunks(df: pd.DataFrame, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    # An in-memory frame as merge_chunks() input (row slices are views, not copies)
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def merge_frame_rows(
+    df: pd.DataFrame,
+    subject_compiled: list[CompiledTemplate],
+    email_compiled: list[CompiledTemplate],
+    chaser_compiled: list[CompiledTemplate],
+    email_col: str | None,
+    blank_fill: str,
+) -> pd.DataFrame:
+    # Row-at-a-time reference implementation of merge_frame()
+    used = [c for t in subject_compiled + email_compiled + chaser_compiled for c in t.columns if c]
+    rows = ColumnarRows(df, used + [email_col])
+
+    subjects = [(t, t.positions(rows.index)) for t in subject_compiled]
+    bodies = [(t, t.positions(rows.index)) for t in email_compiled]
+    chasers = [(t, t.positions(rows.index)) for t in chaser_compiled]
+    email_pos = rows.index[email_col] if email_col else None
+    memo = RenderMemo()
+
+    out_email_address: list[str] = []
+    out_subject: list[str] = []
+    out_email_copy: list[str] = []
+    out_chaser_copy: list[str] = []
+
+    # Generate (preserve row order)
+    for i, values in enumerate(rows):
+        subj_t, subj_pos = subjects[i % len(subjects)]
+        body_t, body_pos = bodies[i % len(bodies)]
+
+        if email_pos is not None:
+            v = values[email_pos]
+            out_email_address.append("" if pd.isna(v) else str(v))
+        else:
+            out_email_address.append("")
+
+        out_subject.append(subj_t.render_values(values, subj_pos, blank_fill, memo))
+        out_email_copy.append(body_t.render_values(values, body_pos, blank_fill, memo))
+        if chasers:
+            chaser_t, chaser_pos = chasers[i % len(chasers)]
+            out_chaser_copy.append(chaser_t.render_values(values, chaser_pos, blank_fill, memo))
+        else:
+            out_chaser_copy.append("")
+
+    empty = [""] * len(df)
+    return pd.DataFrame(
+        {
+            "Email address": out_email_address,
+            "Subject line": out_subject,
+            "Email Copy": out_email_copy,
+            "Email Sent?": empty,
+            "Chaser copy": out_chaser_copy,
+            "Chaser sent?": empty,
+            "Status": empty,
+        },
+        columns=OUTPUT_COLUMNS,
+    )
+
+
+def find_email_column(df: pd.DataFrame) -> str | None:
+    # match any "Email" variant (case/spaces/underscores)
+    for col in df.columns:
+        if norm_key(col) == "email":
+            return col
+    return None
+
+
+def needed_columns(mapping: dict[str, str], email_col: str | None) -> list[str]:
+    # The only input columns a merge reads: mapped placeholders + the email column
+    cols = list(mapping.values()) + ([email_col] if email_col else [])
+    return list(dict.fromkeys(cols))
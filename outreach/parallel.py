@@ -0,0 +1,160 @@
+import multiprocessing
+import os
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from outreach.merge import OUTPUT_COLUMNS, arrow_strings, compact_frame
+
+try:
+    import pyarrow as pa
+except ImportError:  # pickled hand-off only
+    pa = None
+
+# Below this many rows, process start-up + pickling costs more than the merge itself
+PARALLEL_MIN_ROWS = 200_000
+
+# Shards are at most this many rows (still at least one per worker), so progress moves as
+# they finish and a cancel only waits for the shards already running
+SHARD_ROWS = 50_000
+
+# While shards run, `progress` is called at least this often (with 0 rows if none finished)
+PROGRESS_INTERVAL_S = 0.5
+
+# Columns a worker renders; the rest are constant defaults filled in by the parent
+RENDERED_COLUMNS = ["Email address", "Subject line", "Email Copy", "Chaser copy"]
+
+
+def default_workers() -> int:
+    return max(1, min(os.cpu_count() or 1, 8))
+
+
+def shard_bounds(size: int, shards: int) -> list[tuple[int, int]]:
+    # Contiguous [start, stop) row ranges of near-equal size, in order
+    step, extra = divmod(size, shards)
+    bounds, start = [], 0
+    for i in range(shards):
+        stop = start + step + (1 if i < extra else 0)
+        if stop > start:
+            bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+def _merge_shard(plan, shard: pd.DataFrame, start: int, blank_fill: str) -> dict[str, np.ndarray]:
+    # Runs in a worker: `start` is the shard's global row index, so rotation matches a single pass
+    columns = plan.merge_columns(shard, blank_fill, start)
+    return {name: columns[name] for name in RENDERED_COLUMNS}
+
+
+def _write_ipc(path: str, table) -> None:
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_ipc(path: str):
+    # Memory-mapped: buffers point into the page cache instead of being copied
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def _merge_shard_ipc(plan, input_path: str, labels: list, start: int, stop: int, blank_fill: str, output_path: str) -> str:
+    # Runs in a worker: slice the shared input file, render, write the rendered columns back as a file
+    table = _read_ipc(input_path).slice(start, stop - start)
+    shard = table.to_pandas() if table.num_columns else pd.DataFrame(index=range(stop - start))
+    shard.columns = labels
+    columns = plan.merge_columns(shard, blank_fill, start)
+    _write_ipc(output_path, pa.table({name: pa.array(columns[name], type=pa.large_string()) for name in RENDERED_COLUMNS}))
+    return output_path
+
+
+def _collect(pool: ProcessPoolExecutor, futures: list, bounds: list[tuple[int, int]], progress) -> list:
+    # Shard results in shard order, reporting rows as shards finish. If `progress` raises (a
+    # cancel), queued shards are dropped and the pool is shut down once the running ones end
+    rows = {future: stop - start for future, (start, stop) in zip(futures, bounds)}
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=PROGRESS_INTERVAL_S, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()  # a failed shard fails the merge now rather than after the rest
+            if progress is not None:
+                progress(sum(rows[future] for future in done))
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    return [future.result() for future in futures]
+
+
+def _pool_context():
+    # Never fork a (possibly multi-threaded) server process
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def merge_parallel(
+    plan,
+    df: pd.DataFrame,
+    blank_fill: str,
+    workers: int | None = None,
+    min_rows: int = PARALLEL_MIN_ROWS,
+    handoff: str = "arrow",
+    progress: Callable[[int], None] | None = None,
+) -> pd.DataFrame:
+    """MergePlan.merge() with the row range sharded across a process pool.
+    Each worker renders contiguous slices of up to SHARD_ROWS rows and returns columns,
+    which are assembled in shard order. Small inputs (< min_rows) or workers <= 1 stay
+    in-process. `progress` (e.g. GenerationJob.advance) gets the rows of each finished
+    shard; an exception it raises abandons the merge.
+
+    handoff="arrow" (when pyarrow is installed) writes the needed columns once to an Arrow
+    IPC file that workers memory-map and slice, and workers write their rendered columns
+    back the same way, so neither direction pickles a wide object frame and the parent
+    assembles Arrow-backed columns without copying. handoff="pickle" sends frames directly.
+    The whole output is held, so it comes back as a compact_frame().
+    """
+    workers = workers or default_workers()
+    if workers <= 1 or len(df) < min_rows:
+        out_df = plan.merge(df, blank_fill, compact=True)
+        if progress is not None:
+            progress(len(df))
+        return out_df
+
+    bounds = shard_bounds(len(df), max(workers, -(-len(df) // SHARD_ROWS)))
+    empty = np.full(len(df), "", dtype=object)
+    columns = {name: empty for name in OUTPUT_COLUMNS}
+
+    if handoff == "arrow" and pa is not None:
+        labels = list(plan.needed)
+        # Not removed until the frame is built; mapped files stay readable after unlink (POSIX)
+        with tempfile.TemporaryDirectory(prefix="outreach-merge-", ignore_cleanup_errors=True) as tmp:
+            input_path = os.path.join(tmp, "input.arrow")
+            _write_ipc(input_path, pa.table({f"c{i}": arrow_strings(df[col]) for i, col in enumerate(labels)}))
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+                futures = [
+                    pool.submit(
+                        _merge_shard_ipc, plan, input_path, labels, start, stop, blank_fill,
+                        os.path.join(tmp, f"shard{i}.arrow"),
+                    )
+                    for i, (start, stop) in enumerate(bounds)
+                ]
+                rendered = pa.concat_tables([_read_ipc(path) for path in _collect(pool, futures, bounds, progress)])
+            for name in RENDERED_COLUMNS:
+                columns[name] = pd.Series(
+                    rendered.column(name), dtype=pd.ArrowDtype(pa.large_string()), copy=False
+                ).array
+        return compact_frame(columns)
+
+    shard_input = df[plan.needed]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        futures = [
+            pool.submit(_merge_shard, plan, shard_input.iloc[start:stop], start, blank_fill)
+            for start, stop in bounds
+        ]
+        parts = _collect(pool, futures, bounds, progress)
+
+    for name in RENDERED_COLUMNS:
+        columns[name] = np.concatenate([part[name] for part in parts])
+    return compact_frame(columns)
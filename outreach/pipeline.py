@@ -0,0 +1,124 @@
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from outreach.cache import ResultCache
+from outreach.merge import (
+    OUTPUT_COLUMNS,
+    CompiledTemplate,
+    RenderMemo,
+    build_header_map,
+    compact_column,
+    find_email_column,
+    merge_chunks,
+    merge_columns,
+    merge_frame,
+    needed_columns,
+    validate_mappings,
+)
+
+# Rendered output column → the MergePlan templates it rotates through
+RENDERED_ROLES = {"Subject line": "subject", "Email Copy": "email", "Chaser copy": "chaser"}
+
+
+class UnmappedPlaceholders(ValueError):
+    def __init__(self, placeholders: list[str]):
+        super().__init__("Unmapped placeholders: " + ", ".join(placeholders))
+        self.placeholders = placeholders
+
+
+@dataclass
+class MergePlan:
+    """Everything a merge needs that depends only on the header row and the templates."""
+
+    mapping: dict[str, str]
+    email_col: str | None
+    subject: list[CompiledTemplate]
+    email: list[CompiledTemplate]
+    chaser: list[CompiledTemplate]
+
+    @property
+    def needed(self) -> list[str]:
+        return needed_columns(self.mapping, self.email_col)
+
+    def merge_columns(self, df: pd.DataFrame, blank_fill: str, start: int = 0) -> dict[str, np.ndarray]:
+        return merge_columns(df, self.subject, self.email, self.chaser, self.email_col, blank_fill, start)
+
+    def merge(self, df: pd.DataFrame, blank_fill: str, start: int = 0, compact: bool = False) -> pd.DataFrame:
+        return merge_frame(df, self.subject, self.email, self.chaser, self.email_col, blank_fill, start, compact=compact)
+
+    def merge_chunks(self, chunks: Iterable[pd.DataFrame], blank_fill: str, start: int = 0) -> Iterator[pd.DataFrame]:
+        return merge_chunks(chunks, self.subject, self.email, self.chaser, self.email_col, blank_fill, start)
+
+    # ---------------- rendered column cache ----------------
+
+    def column_key(self, name: str, source_key: str, blank_fill: str) -> str:
+        # A rendered column depends only on the whole lead list, its own templates and blank_fill
+        templates = [t.template for t in getattr(self, RENDERED_ROLES[name])]
+        return ResultCache.key(source_key, name, templates, blank_fill)
+
+    def cached_columns(self, cache: ResultCache, source_key: str, blank_fill: str) -> dict:
+        # {output column: values} for the rendered columns already in `cache`
+        found = {name: cache.get(self.column_key(name, source_key, blank_fill)) for name in RENDERED_ROLES}
+        return {name: values for name, values in found.items() if values is not None}
+
+    def cache_columns(self, columns: dict, cache: ResultCache, source_key: str, blank_fill: str) -> None:
+        # Stores whole-list rendered columns (any of RENDERED_ROLES present in `columns`) compacted
+        for name in RENDERED_ROLES.keys() & columns.keys():
+            cache.put(self.column_key(name, source_key, blank_fill), compact_column(columns[name]))
+
+    def merge_chunks_cached(
+        self, chunks: Iterable[pd.DataFrame], blank_fill: str, cache: ResultCache, source_key: str
+    ) -> Iterator[pd.DataFrame]:
+        """merge_chunks() that reuses rendered columns from `cache` (a ResultCache of columns,
+        see column_bytes()). `source_key` identifies the whole lead list, so after editing
+        only the chaser copy, only that column is rendered again and the rest are sliced from
+        the cache. `chunks` must cover the list from row 0; fresh columns are stored once
+        the stream is exhausted.
+        """
+        cached = self.cached_columns(cache, source_key, blank_fill)
+        fresh: dict[str, list[np.ndarray]] = {name: [] for name in RENDERED_ROLES if name not in cached}
+        # Roles served from the cache get no templates, so merge_columns() neither cleans nor renders for them
+        roles = [getattr(self, role) if name in fresh else [] for name, role in RENDERED_ROLES.items()]
+        start = 0
+        memo = RenderMemo()
+        for chunk in chunks:
+            stop = start + len(chunk)
+            columns = merge_columns(chunk, *roles, self.email_col, blank_fill, start, memo)
+            for name, parts in fresh.items():
+                parts.append(columns[name])
+            for name, values in cached.items():
+                columns[name] = values[start:stop]
+            yield pd.DataFrame(columns, columns=OUTPUT_COLUMNS)
+            start = stop
+        self.cache_columns(
+            {name: np.concatenate(parts) if parts else np.empty(0, dtype=object) for name, parts in fresh.items()},
+            cache,
+            source_key,
+            blank_fill,
+        )
+
+
+def plan_merge(
+    columns: list,
+    subject_templates: list[str],
+    email_templates: list[str],
+    chaser_templates: list[str],
+) -> MergePlan:
+    # Validate placeholders across subject + email + chaser; raises UnmappedPlaceholders
+    header = pd.DataFrame(columns=columns)
+    mapping, missing = validate_mappings(
+        subject_templates + email_templates + chaser_templates, build_header_map(header)
+    )
+    if missing:
+        raise UnmappedPlaceholders(missing)
+
+    return MergePlan(
+        mapping=mapping,
+        email_col=find_email_column(header),
+        subject=[CompiledTemplate(t, mapping) for t in subject_templates],
+        email=[CompiledTemplate(t, mapping) for t in email_templates],
+        chaser=[CompiledTemplate(t, mapping) for t in chaser_templates],
+    )
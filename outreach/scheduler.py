@@ -0,0 +1,85 @@
+import threading
+from collections import deque
+
+# Peak memory of a generation per byte of upload, by input format (the rendered copy dwarfs
+# the input, and compressed inputs expand once parsed). .xlsx measured at 4x for wide sheets
+# up to ~15x for narrow ones, streamed or not, since the output workbook dominates; the same
+# lists as .csv, .csv.gz and .parquet peaked at about 0.4x, 0.8x and 4x the .xlsx figure per
+# upload byte. Gzip and Parquet compress real lead lists (repetitive text) better than those
+# synthetic ones, so their factors lean high.
+MEMORY_PER_UPLOAD_BYTE = {"xlsx": 12, "csv": 5, "csv.gz": 20, "parquet": 48}
+
+
+def estimate_job_bytes(upload_bytes: int, fmt: str = "xlsx") -> int:
+    # `fmt`: a MEMORY_PER_UPLOAD_BYTE key (input_format(), with gzipped CSV as "csv.gz")
+    return upload_bytes * MEMORY_PER_UPLOAD_BYTE.get(fmt, MEMORY_PER_UPLOAD_BYTE["xlsx"])
+
+
+class Ticket:
+    __slots__ = ("estimate",)
+
+    def __init__(self, estimate: int):
+        self.estimate = estimate
+
+
+class AdmissionScheduler:
+    """Process-wide FIFO admission for generations, shared by every session.
+    At most `max_concurrent` jobs run at once and the memory estimates of running jobs stay
+    within `memory_budget` (None: no budget); a job estimated above the whole budget still
+    runs, but only alone. Later tickets never overtake the head of the queue.
+    """
+
+    def __init__(self, max_concurrent: int = 2, memory_budget: int | None = None):
+        self.max_concurrent = max(1, max_concurrent)
+        self.memory_budget = memory_budget
+        self._queue: deque[Ticket] = deque()
+        self._running: set[Ticket] = set()
+        self._cond = threading.Condition()
+
+    def enqueue(self, estimate: int) -> Ticket:
+        ticket = Ticket(estimate)
+        with self._cond:
+            self._queue.append(ticket)
+        return ticket
+
+    def _fits(self, ticket: Ticket) -> bool:
+        if len(self._running) >= self.max_concurrent:
+            return False
+        if not self._running or self.memory_budget is None:
+            return True
+        return sum(t.estimate for t in self._running) + ticket.estimate <= self.memory_budget
+
+    def wait(self, ticket: Ticket, cancelled: threading.Event | None = None, poll: float = 0.25) -> bool:
+        # Blocks until admitted (True) or `cancelled` is set (False, ticket withdrawn)
+        with self._cond:
+            while not (self._queue[0] is ticket and self._fits(ticket)):
+                if cancelled is not None and cancelled.is_set():
+                    self._queue.remove(ticket)
+                    self._cond.notify_all()
+                    return False
+                self._cond.wait(poll)
+            self._queue.popleft()
+            self._running.add(ticket)
+            self._cond.notify_all()
+            return True
+
+    def release(self, ticket: Ticket) -> None:
+        with self._cond:
+            self._running.discard(ticket)
+            self._cond.notify_all()
+
+    def position(self, ticket: Ticket) -> int:
+        # 1-based place in the queue; 0 once admitted (or withdrawn)
+        with self._cond:
+            try:
+                return self._queue.index(ticket) + 1
+            except ValueError:
+                return 0
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
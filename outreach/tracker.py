@@ -0,0 +1,104 @@
+from collections.abc import Callable, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from outreach.export import SHEET_NAME
+from outreach.ingest import excel_sheet_names, excel_sheets_with_data, open_stream
+from outreach.merge import OUTPUT_COLUMNS, email_column_text, frame_chunks
+from outreach.pipeline import MergePlan
+
+
+def read_tracker(source, fmt: str = "xlsx", engine: str = "auto") -> pd.DataFrame:
+    """An earlier output (the Outreach sheet of an .xlsx, or a .csv/.parquet) as a frame of
+    its cells, blanks as "", so its rows can be written back as they are: OUTPUT_COLUMNS
+    (missing ones blank), then any columns the team added (notes, owners…) in their order.
+    Nothing is read as missing ("N/A" or "None" stay text) and cells typed into the sheet
+    since (dates, numbers) keep their values. Other sheets holding data cannot be carried
+    into the output, so a workbook with any is refused rather than silently cut down.
+    """
+    sheet = 0
+    if fmt == "xlsx":
+        sheet = SHEET_NAME if SHEET_NAME in excel_sheet_names(source) else excel_sheet_names(source)[0]
+        if hasattr(source, "seek"):
+            source.seek(0)
+        others = [name for name in excel_sheets_with_data(source) if name != sheet]
+        if others:
+            raise ValueError(
+                f"The tracker has other sheets with data ({', '.join(others)}), which appending would drop. "
+                f"Move them to another workbook first."
+            )
+        if hasattr(source, "seek"):
+            source.seek(0)
+    stream = open_stream(source, fmt, sheet=sheet, engine=engine, na_strings=False)
+    present = [col for col in OUTPUT_COLUMNS if col in stream.columns]
+    if not present:
+        stream.close()
+        raise ValueError("No output columns (Email address, Subject line, …) in the tracker")
+    extra = [col for col in stream.columns if col not in OUTPUT_COLUMNS]
+    stream.select_columns(present + extra)
+    chunks = list(stream)
+    frame = pd.concat(chunks, ignore_index=True) if chunks else stream.header_frame()[stream.selected]
+    cells = {col: frame[col].astype(object) for col in stream.selected}
+    cells = {col: values.mask(values.isna(), "") for col, values in cells.items()}
+    # Columns with neither a header nor a value are sheet padding rather than work to keep
+    extra = [col for col in extra if not (str(col).startswith("Unnamed: ") and cells[col].eq("").all())]
+    return pd.DataFrame(
+        {col: cells.get(col, "") for col in [*OUTPUT_COLUMNS, *extra]},
+        index=range(len(frame)),
+    )
+
+
+def normalized_emails(values: pd.Series) -> np.ndarray:
+    # Trimmed and lower-cased, so "Jo@X.com " matches "jo@x.com"; blanks are ""
+    return pd.Series(email_column_text(values), dtype=object).str.strip().str.lower().to_numpy(dtype=object)
+
+
+class LeadFilter:
+    """Keeps only leads whose email is not in the tracker yet (nor earlier in the upload).
+    The index holds 64-bit hashes of normalized_emails() rather than the addresses. Leads
+    without an email cannot be matched and are always kept.
+    """
+
+    def __init__(self, tracker_emails: pd.Series):
+        emails = normalized_emails(tracker_emails)
+        self.seen: set[int] = set(pd.util.hash_array(emails[emails != ""]).tolist())
+        self.kept = 0
+        self.skipped = 0
+
+    def new_rows(self, emails: pd.Series) -> np.ndarray:
+        normalized = normalized_emails(emails)
+        keep = np.ones(len(normalized), dtype=bool)
+        for i, (email, key) in enumerate(zip(normalized, pd.util.hash_array(normalized).tolist())):
+            if not email:
+                continue
+            if key in self.seen:
+                keep[i] = False
+            else:
+                self.seen.add(key)
+        self.kept += int(keep.sum())
+        self.skipped += len(keep) - int(keep.sum())
+        return keep
+
+    def filter(
+        self, chunks: Iterable[pd.DataFrame], email_col: str, skipped: Callable[[int], None] | None = None
+    ) -> Iterator[pd.DataFrame]:
+        # `skipped` gets the rows dropped from each chunk (e.g. GenerationJob.advance, for progress)
+        for chunk in chunks:
+            keep = self.new_rows(chunk[email_col])
+            if skipped is not None:
+                skipped(len(keep) - int(keep.sum()))
+            yield chunk[keep]
+
+
+def append_chunks(
+    plan: MergePlan, tracker: pd.DataFrame, chunks: Iterable[pd.DataFrame], blank_fill: str, chunk_rows: int
+) -> Iterator[pd.DataFrame]:
+    """The tracker's rows exactly as they are (sent marks, Status and added columns
+    included, nothing re-rendered), then the merged `chunks` (e.g. LeadFilter.filter() of a
+    new upload), rotating on from the tracker's last row as if the list had been generated
+    in one go. New rows are blank in the tracker's added columns.
+    """
+    yield from frame_chunks(tracker, chunk_rows)
+    for chunk in plan.merge_chunks(chunks, blank_fill, start=len(tracker)):
+        yield chunk.reindex(columns=tracker.columns, fill_value="")
@@ -0,0 +1,103 @@
+import datetime
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from outreach import frame_chunks, merge_frame_rows, merge_incremental, merge_parallel, plan_merge
+
+SUBJECTS = ["Hi {{first_name}}", "{{niche}} for {{ Company }}", "Quick question"]
+BODIES = ["Dear {{First Name}}, about {{niche}} at {{company}}.{{Joined}}", "{{niche}}{{niche}} {{active}}"]
+CHASERS = ["Following up, {{first_name}}"]
+
+# Cells as they come out of the readers: text, blanks of every kind, and typed values
+CELLS = [
+    "Jo",
+    "Ann Lee",
+    None,
+    float("nan"),
+    pd.NA,
+    "",
+    " ",
+    "\t",
+    3,
+    12.0,
+    2.5,
+    True,
+    False,
+    datetime.datetime(2024, 5, 1, 9, 30),
+    pd.Timestamp("2023-12-31"),
+]
+
+
+def leads(rows: int, seed: int = 1) -> pd.DataFrame:
+    rng = random.Random(seed)
+    columns = ["First Name", "Niche", "Company", "Joined", "Active"]
+    data = {col: [rng.choice(CELLS) for _ in range(rows)] for col in columns}
+    data["E mail"] = [rng.choice(CELLS + [f"lead{i}@example.com", f" Lead{i}@Example.com "]) for i in range(rows)]
+    return pd.DataFrame(data, dtype=object)
+
+
+def cells(frame: pd.DataFrame) -> pd.DataFrame:
+    # Compact/Arrow-backed outputs compared by their cell values
+    return frame.astype(object).reset_index(drop=True)
+
+
+@pytest.fixture(scope="module")
+def df() -> pd.DataFrame:
+    return leads(1_000)
+
+
+@pytest.fixture(scope="module")
+def plan(df):
+    return plan_merge(list(df.columns), SUBJECTS, BODIES, CHASERS)
+
+
+@pytest.fixture(scope="module")
+def expected(df, plan) -> pd.DataFrame:
+    return cells(plan.merge(df, "[M]"))
+
+
+def test_row_reference(df, plan, expected):
+    rows = merge_frame_rows(df, plan.subject, plan.email, plan.chaser, plan.email_col, "[M]")
+    pd.testing.assert_frame_equal(cells(rows), expected)
+
+
+def test_compact(df, plan, expected):
+    pd.testing.assert_frame_equal(cells(plan.merge(df, "[M]", compact=True)), expected)
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 333, 5_000])
+def test_chunks(df, plan, expected, chunk_rows):
+    merged = pd.concat(plan.merge_chunks(frame_chunks(df, chunk_rows), "[M]"), ignore_index=True)
+    pd.testing.assert_frame_equal(cells(merged), expected)
+
+
+@pytest.mark.parametrize("start", [1, 2, 5, 6, 500])
+def test_chunks_offset(df, plan, expected, start):
+    # Starting part-way keeps the rotation of the whole list
+    merged = pd.concat(plan.merge_chunks(frame_chunks(df.iloc[start:], 64), "[M]", start=start), ignore_index=True)
+    pd.testing.assert_frame_equal(cells(merged), expected.iloc[start:].reset_index(drop=True))
+
+
+@pytest.mark.parametrize("handoff", ["arrow", "pickle"])
+def test_parallel(df, plan, expected, handoff):
+    if handoff == "arrow":
+        pytest.importorskip("pyarrow")
+    merged = merge_parallel(plan, df, "[M]", workers=2, min_rows=0, handoff=handoff)
+    pd.testing.assert_frame_equal(cells(merged), expected)
+
+
+def test_incremental(df, plan, expected):
+    first, snapshot, _ = merge_incremental(plan, df, "[M]")
+    pd.testing.assert_frame_equal(cells(first), expected)
+
+    # Reshuffled, with some rows edited, dropped and added
+    rng = np.random.default_rng(2)
+    again = pd.concat([df.iloc[rng.permutation(len(df))[:900]], leads(150, seed=3)], ignore_index=True)
+    again.loc[::17, "Niche"] = "Edited"
+    again.loc[::23, "E mail"] = None
+    merged, _, changes = merge_incremental(plan, again, "[M]", snapshot)
+    pd.testing.assert_frame_equal(cells(merged), cells(plan.merge(again, "[M]")))
+    assert changes.unchanged > 0 and changes.changed > 0